@@ -0,0 +1,142 @@
+"""Perception throughput benchmark.
+
+Pushes a clip through the full perception path (capture, flip/RGB
+conversion, FaceMesh with metrics and head pose, Hands) as fast as possible
+and reports frames/sec plus per-stage latency percentiles::
+
+    python -m face_controls.benchmark clip.mp4
+    python -m face_controls.benchmark frames/ --no-hands --roi
+    python -m face_controls.benchmark --synthetic 640x480 --frames 300
+"""
+import argparse
+import json
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from face_controls.face import FaceController, OVERLAY_OFF
+from face_controls.hands import HandTracker
+from face_controls.sources import ArraySource, open_source
+
+STAGES = ('capture', 'preprocess', 'face', 'hands', 'total')
+PERCENTILES = (50, 95, 99)
+
+
+def synthetic_frames(width, height, count, seed=0):
+    """Generator of ``count`` random BGR frames (no faces, pure pipeline cost)."""
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        yield rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+
+def summarize(samples):
+    """Per-stage mean and percentile latencies in milliseconds."""
+    stats = {}
+    for stage, values in samples.items():
+        if not values:
+            continue
+        ms = np.asarray(values) * 1000.0
+        stats[stage] = {'mean': float(ms.mean())}
+        for p, v in zip(PERCENTILES, np.percentile(ms, PERCENTILES)):
+            stats[stage][f'p{p}'] = float(v)
+    return stats
+
+
+def run(source, max_frames=None, warmup=10, hands=True, **face_kwargs):
+    """Benchmark ``source`` and return a result dict (fps, frames, stages)."""
+    face = FaceController(source=open_source(source), lazy_overlay=True,
+                          overlay=OVERLAY_OFF, **face_kwargs)
+    tracker = HandTracker() if hands else None
+    samples = {stage: [] for stage in STAGES}
+    clock = time.perf_counter
+    frames = 0
+    faces = 0
+    start = end = None
+    try:
+        while max_frames is None or frames < max_frames + warmup:
+            t0 = clock()
+            ret, frame, ts, _ = face.grab()
+            if not ret:
+                break
+            t1 = clock()
+            face.frame_time = ts
+            frame = cv2.flip(frame, 1)
+            img_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            t2 = clock()
+            metrics_list = face.track(frame, ts, img_rgb)
+            t3 = clock()
+            if tracker:
+                tracker.process(img_rgb)
+            t4 = clock()
+            frames += 1
+            if frames <= warmup:
+                # Model initialisation and caches settle during warm-up
+                start = t4
+                continue
+            if start is None:
+                # No warm-up: measure from the first frame's capture
+                start = t0
+            # Measured time ends with the last frame, before any teardown
+            end = t4
+            faces += len(metrics_list)
+            for stage, dt in zip(STAGES, (t1 - t0, t2 - t1, t3 - t2, t4 - t3, t4 - t0)):
+                samples[stage].append(dt)
+    finally:
+        if tracker:
+            tracker.close()
+        face.release()
+    measured = len(samples['total'])
+    elapsed = end - start if measured else 0.0
+    if not tracker:
+        del samples['hands']
+    return {
+        'frames': measured,
+        'fps': measured / elapsed if elapsed else 0.0,
+        'faces_per_frame': faces / measured if measured else 0.0,
+        'stages': summarize(samples),
+    }
+
+
+def format_report(result):
+    lines = [f"{result['frames']} frames, {result['fps']:.1f} fps, "
+             f"{result['faces_per_frame']:.2f} faces/frame",
+             f"{'stage':<12}{'mean':>9}" + ''.join(f"{'p%d' % p:>9}" for p in PERCENTILES)]
+    for stage, stats in result['stages'].items():
+        lines.append(f"{stage:<12}{stats['mean']:>9.2f}"
+                     + ''.join(f"{stats['p%d' % p]:>9.2f}" for p in PERCENTILES))
+    lines.append("(latencies in ms)")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('source', nargs='?', default=None,
+                        help="video file, image directory/glob or camera index")
+    parser.add_argument('--synthetic', metavar='WxH',
+                        help="use generated random frames of this size instead of a source")
+    parser.add_argument('--frames', type=int, help="frames to measure (default: whole source)")
+    parser.add_argument('--warmup', type=int, default=10, help="frames to run before measuring")
+    parser.add_argument('--no-hands', action='store_true', help="skip hand tracking")
+    parser.add_argument('--roi', action='store_true', help="enable ROI-cropped face tracking")
+    parser.add_argument('--infer-every', type=int, default=1, help="run FaceMesh every Nth frame")
+    parser.add_argument('--solver', default='iterative', help="PnP solver for head pose")
+    parser.add_argument('--json', action='store_true', help="print the result as JSON")
+    args = parser.parse_args(argv)
+    if args.synthetic:
+        w, h = (int(v) for v in args.synthetic.lower().split('x'))
+        count = (args.frames or 300) + args.warmup
+        source = ArraySource(synthetic_frames(w, h, count))
+    elif args.source is None:
+        parser.error("a source or --synthetic is required")
+    else:
+        source = int(args.source) if args.source.isdigit() else args.source
+    result = run(source, max_frames=args.frames, warmup=args.warmup, hands=not args.no_hands,
+                 roi_tracking=args.roi, infer_every=args.infer_every, pnp_solver=args.solver)
+    print(json.dumps(result, indent=2) if args.json else format_report(result))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,73 @@
+import threading
+import time
+
+from face_controls.sources import open_source
+
+
+class ThreadedCapture:
+    """Grab frames on a background thread into a single latest-frame slot.
+
+    The producer overwrites the slot on every grab, so consumers always get the
+    freshest frame and stale ones are dropped instead of queueing up.
+    """
+
+    def __init__(self, source=0, timeout=1.0):
+        self.cap = open_source(source)
+        self.timeout = timeout
+        # Latest frame slot: (frame, capture timestamp, sequence number)
+        self._frame = None
+        self._timestamp = 0.0
+        self._seq = 0
+        self._ok = True
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='ThreadedCapture', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while self._running:
+            ret, frame = self.cap.read()
+            ts = time.perf_counter()
+            with self._cond:
+                if not ret:
+                    # Source exhausted or camera lost
+                    self._ok = False
+                    self._cond.notify_all()
+                    break
+                self._frame = frame
+                self._timestamp = ts
+                self._seq += 1
+                self._cond.notify_all()
+
+    def read(self, last_seq=None, wait=False):
+        """Return (ok, frame, timestamp, seq) for the freshest frame.
+
+        Blocks (at most ``timeout`` seconds) only until the first frame arrives,
+        or, with ``wait=True``, until a frame newer than ``last_seq`` is captured.
+        Otherwise the current slot is returned immediately; callers compare
+        ``seq`` with the previous one to detect a repeated frame.
+        """
+        with self._cond:
+            if self._seq == 0 or (wait and self._seq == last_seq):
+                stale = self._seq
+                self._cond.wait_for(
+                    lambda: not self._ok or self._seq != stale,
+                    timeout=self.timeout
+                )
+            if self._frame is None:
+                return False, None, 0.0, 0
+            ok = self._ok or self._seq != last_seq
+            return ok, self._frame, self._timestamp, self._seq
+
+    @property
+    def active(self):
+        """False once the source is exhausted or the capture was released."""
+        return self._ok and self._running
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self._running = False
+        self._thread.join(timeout=self.timeout)
+        self.cap.release()
@@ -1,126 +1,407 @@
 import cv2
 import mediapipe as mp
 import numpy as np
-import math
+import threading
+import time
+from face_controls.capture import ThreadedCapture
+from face_controls.filters import OneEuroFilter
+from face_controls.landmarks import METRIC_IDXS, landmarks_to_array, compute_metrics
+from face_controls.metrics import FaceMetricsBatch
+from face_controls.pose import HeadPoseEstimator
+from face_controls.profiling import NULL_PROFILER
+from face_controls.roi import RoiTracker
+from face_controls.sources import open_source
+from face_controls.streams import LATEST, Stamped, Stream, carry_blinks
+
+# Face-mesh overlay modes for the debug preview
+OVERLAY_OFF = 'off'
+OVERLAY_CONTOURS = 'contours'
+OVERLAY_FULL = 'full'
+OVERLAY_COLOR = (224, 224, 224)
+# Most faces tracked at once (multiplayer)
+MAX_FACES = 4
 
 class FaceController:
-    def __init__(self, camera_index=0, detection_confidence=0.5, tracking_confidence=0.5):
-        self.cap = cv2.VideoCapture(camera_index)
+    def __init__(self, camera_index=0, detection_confidence=0.5, tracking_confidence=0.5,
+                 threaded=False, overlay=OVERLAY_FULL, lazy_overlay=False,
+                 infer_every=1, infer_interval=None,
+                 roi_tracking=False, roi_size=256, redetect_interval=1.0,
+                 calibration=None, pnp_solver='iterative', source=None,
+                 profiler=None):
+        # Frames come from the webcam unless another source is given: a video
+        # file, a directory of images, a frame generator or any object with
+        # a cv2.VideoCapture-style read() (see face_controls.sources)
+        source = open_source(camera_index if source is None else source)
+        # Threaded mode grabs frames on a background thread so read() never
+        # waits on the camera's frame interval
+        self.threaded = threaded
+        if threaded:
+            self.cap = ThreadedCapture(source)
+        else:
+            self.cap = source
         self.mp_face_mesh = mp.solutions.face_mesh
-        # Allow up to 4 faces for multiplayer
-        self.face_mesh = self.mp_face_mesh.FaceMesh(
+        self.detection_confidence = detection_confidence
+        self.tracking_confidence = tracking_confidence
+        # Quality settings, adjustable at runtime with set_quality(): iris
+        # refinement, the scale FaceMesh sees the frame at and the face cap
+        self.refine_landmarks = True
+        self.inference_scale = 1.0
+        self.max_num_faces = MAX_FACES
+        self.face_mesh = self._make_mesh(self.max_num_faces)
+        # Changes requested by set_quality(), applied by the inference thread
+        self._pending_quality = {}
+        self._quality_lock = threading.Lock()
+        # ROI tracking: landmark each known face on a small crop around its last
+        # box and only search the full frame when a track is lost or every
+        # redetect_interval seconds
+        self.roi_tracker = None
+        if roi_tracking:
+            self.roi_tracker = RoiTracker(
+                lambda: self._make_mesh(1),
+                crop_size=roi_size,
+                redetect_interval=redetect_interval
+            )
+        # Overlay mode and whether drawing is deferred to draw_overlay()
+        if overlay not in (OVERLAY_OFF, OVERLAY_CONTOURS, OVERLAY_FULL):
+            raise ValueError(f"Unknown overlay mode: {overlay}")
+        self.overlay = overlay
+        self.lazy_overlay = lazy_overlay
+        # Mesh edges as (E, 2) landmark index pairs per overlay mode
+        self.overlay_edges = {
+            OVERLAY_CONTOURS: np.array(sorted(self.mp_face_mesh.FACEMESH_CONTOURS)),
+            OVERLAY_FULL: np.array(sorted(self.mp_face_mesh.FACEMESH_TESSELATION)),
+        }
+        # Head pose solver with cached intrinsics and per-face warm start
+        self.pose = HeadPoseEstimator(calibration, solver=pnp_solver)
+        # Blink detection state for each face slot
+        self.prev_eyes_closed = np.zeros(MAX_FACES, dtype=bool)
+        self.blink_threshold = 0.2
+        # Landmarks of the last processed frame: an array, or the MediaPipe
+        # faces with the frame size, converted only when ``landmarks`` is read
+        self._landmark_source = np.empty((0, 0, 3))
+        self._landmark_cache = (None, None)
+        # Capture timestamp (perf_counter) of the last processed frame
+        self.frame_time = None
+        # Last processed frame in threaded mode, reused when no newer frame exists
+        self._last_seq = None
+        self._last_result = (FaceMetricsBatch(), None)
+        self._last_frame = None
+        # Frame skipping: run FaceMesh every Nth frame and/or at most once per
+        # infer_interval seconds, predicting metrics in between
+        self.infer_every = max(1, infer_every)
+        self.infer_interval = infer_interval
+        self.predicting = self.infer_every > 1 or bool(infer_interval)
+        self._frame_count = 0
+        self._last_infer_time = None
+        # One filter per face over (yaw, pitch, roll, mouth_open_ratio, x, y);
+        # the lock lets another thread predict() while inference updates them
+        self.face_filters = []
+        self._predict_lock = threading.Lock()
+        # Timing spans for FaceMesh and solvePnP (no-op unless a Profiler is given)
+        self.profiler = profiler or NULL_PROFILER
+        # Shared capture-and-inference thread behind stream(), started on demand
+        self._stream = None
+
+    def _make_mesh(self, max_faces):
+        return self.mp_face_mesh.FaceMesh(
             static_image_mode=False,
-            max_num_faces=4,
-            refine_landmarks=True,
-            min_detection_confidence=detection_confidence,
-            min_tracking_confidence=tracking_confidence
+            max_num_faces=max_faces,
+            refine_landmarks=self.refine_landmarks,
+            min_detection_confidence=self.detection_confidence,
+            min_tracking_confidence=self.tracking_confidence
         )
-        # Store max faces for iteration
-        self.max_num_faces = 4
-        self.drawing_utils = mp.solutions.drawing_utils
-        self.drawing_specs = self.drawing_utils.DrawingSpec(thickness=1, circle_radius=1)
-        # Blink detection state for each face
-        self.prev_eyes_closed = []
-        self.blink_threshold = 0.2
 
-    def read(self):
-        ret, frame = self.cap.read()
+    def set_quality(self, refine_landmarks=None, inference_scale=None, max_faces=None):
+        """Change inference quality; arguments left as None keep their setting.
+
+        ``refine_landmarks`` toggles the iris landmarks (unused by the
+        metrics), ``inference_scale`` downscales frames before full-frame
+        FaceMesh and ``max_faces`` caps the faces searched for. Changing
+        refinement or the face cap rebuilds FaceMesh, which restarts tracking.
+
+        May be called from any thread: the change is queued and made by the
+        thread running inference before its next FaceMesh call, so a mesh is
+        never replaced while it is processing a frame.
+        """
+        changes = {'refine_landmarks': refine_landmarks, 'inference_scale': inference_scale,
+                   'max_faces': max_faces}
+        with self._quality_lock:
+            self._pending_quality.update(
+                (name, value) for name, value in changes.items() if value is not None)
+
+    def _apply_quality(self):
+        with self._quality_lock:
+            changes, self._pending_quality = self._pending_quality, {}
+        refine_landmarks = changes.get('refine_landmarks')
+        inference_scale = changes.get('inference_scale')
+        max_faces = changes.get('max_faces')
+        rebuild = False
+        if refine_landmarks is not None and refine_landmarks != self.refine_landmarks:
+            self.refine_landmarks = refine_landmarks
+            rebuild = True
+            if self.roi_tracker is not None:
+                # Per-face crop meshes are recreated with the new setting
+                self.roi_tracker.meshes = []
+                self.roi_tracker.reset()
+        if max_faces is not None:
+            max_faces = max(1, min(MAX_FACES, max_faces))
+            if max_faces != self.max_num_faces:
+                self.max_num_faces = max_faces
+                rebuild = True
+        if rebuild:
+            self.face_mesh = self._make_mesh(self.max_num_faces)
+        if inference_scale is not None:
+            self.inference_scale = inference_scale
+
+    def grab(self, wait=False):
+        """Return (ok, frame, timestamp, fresh) for the next raw camera frame.
+
+        In threaded mode ``wait=True`` blocks (up to the capture timeout) for
+        a frame newer than the last one grabbed.
+        """
+        if not self.threaded:
+            ret, frame = self.cap.read()
+            return ret, frame, time.perf_counter(), True
+        ret, frame, ts, seq = self.cap.read(self._last_seq, wait=wait)
+        fresh = seq != self._last_seq
+        self._last_seq = seq
+        return ret, frame, ts, fresh
+
+    @property
+    def landmarks(self):
+        """Pixel-space landmarks (faces, N, 3) of the last processed frame.
+
+        Inference only converts the landmarks the metrics use; the full mesh
+        is converted here, on first use, for overlays and callers that ask.
+        """
+        source = self._landmark_source
+        if isinstance(source, np.ndarray):
+            return source
+        cached, landmarks = self._landmark_cache
+        if cached is not source:
+            landmarks = landmarks_to_array(*source)
+            # Cached by source so a newer frame is never overwritten with an older one
+            self._landmark_cache = (source, landmarks)
+        return landmarks
+
+    def draw_overlay(self, frame, mode=None):
+        """Draw the mesh of the last processed faces onto ``frame`` in place.
+
+        Uses the configured overlay mode unless ``mode`` is given. Intended for
+        lazy rendering right before a preview is shown.
+        """
+        mode = mode or self.overlay
+        if mode == OVERLAY_OFF or frame is None:
+            return frame
+        landmarks = self.landmarks
+        if not len(landmarks):
+            return frame
+        edges = self.overlay_edges[mode]
+        # All faces' edges as (faces * E, 2, 2) segments in one polylines call
+        segs = landmarks[:, edges, :2].reshape(-1, 2, 2)
+        cv2.polylines(frame, np.round(segs).astype(np.int32), False, OVERLAY_COLOR, 1)
+        return frame
+
+    def read(self, with_landmarks=False):
+        """Return (metrics_list, frame) for the latest frame.
+
+        ``metrics_list`` holds one FaceMetrics per face, which also supports
+        the old dict-style access. With ``with_landmarks=True`` the
+        pixel-space landmark array is returned as a third element.
+        """
+        batch, frame = self._read()
+        if with_landmarks:
+            return batch.to_list(), frame, self.landmarks
+        return batch.to_list(), frame
+
+    def read_batch(self):
+        """Return (FaceMetricsBatch, frame) for the latest frame, without per-face objects."""
+        return self._read()
+
+    def stream(self, policy=LATEST, maxsize=1):
+        """Subscribe to results as Stamped('face') items holding a FaceMetricsBatch.
+
+        Each new camera frame is tracked once on a shared background thread
+        and delivered to every subscriber with the given backpressure policy
+        (see face_controls.streams); blinks in dropped results carry into
+        the next one. Iterate the subscription with ``for`` or ``async for``.
+        Do not also call read() while streaming.
+        """
+        if self._stream is None:
+            self._stream = Stream(self._next_stamped, 'face', coalesce=carry_blinks)
+        return self._stream.subscribe(policy, maxsize)
+
+    def _next_stamped(self):
+        ret, frame, ts, fresh = self.grab(wait=True)
         if not ret:
-            return [], None
+            if self.threaded and self.cap.active:
+                # No first frame yet
+                return None
+            raise StopIteration
+        if not fresh:
+            return None
+        self.frame_time = ts
         frame = cv2.flip(frame, 1)
-        img_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.face_mesh.process(img_rgb)
+        return Stamped(ts, 'face', self.track(frame, ts), frame)
+
+    def cached_result(self):
+        """Previous (FaceMetricsBatch, frame) with blink events cleared.
+
+        Used when the camera has not produced a newer frame, so inference is
+        skipped without re-firing blinks.
+        """
+        batch, frame = self._last_result
+        return batch.without_blinks(), frame
+
+    def should_infer(self, ts):
+        """Whether the frame captured at ``ts`` should run FaceMesh."""
+        if not self.predicting or self._last_infer_time is None:
+            return True
+        if self.infer_interval and ts - self._last_infer_time >= self.infer_interval:
+            return True
+        return self.infer_every > 1 and self._frame_count % self.infer_every == 0
+
+    def predict(self, ts):
+        """FaceMetricsBatch extrapolated to ``ts`` from each face's filter.
+
+        Eye state is held from the last inference and blink events are only
+        ever raised on inference frames, so they fire exactly once.
+        """
+        with self._predict_lock:
+            last, _ = self._last_result
+            n = min(len(last), len(self.face_filters))
+            batch = last[:n].without_blinks()
+            if n:
+                values = np.array([filt.predict(ts) for filt in self.face_filters[:n]])
+        if n:
+            values[:, 3] = np.maximum(values[:, 3], 0.0)
+            self._set_filtered(batch, values)
+        return batch
+
+    @staticmethod
+    def _set_filtered(batch, values):
+        # values: (faces, 6) yaw, pitch, roll, mouth_open_ratio, x, y
+        data = batch.data
+        data['yaw'], data['pitch'], data['roll'], data['mouth_open_ratio'] = values[:, :4].T
+        data['face_coords'] = values[:, 4:]
+
+    def _smooth(self, batch, ts):
+        # Keep one filter per face slot; new or vanished faces reset their slot
+        del self.face_filters[len(batch):]
+        while len(self.face_filters) < len(batch):
+            self.face_filters.append(OneEuroFilter())
+        if not len(batch):
+            return
+        values = np.column_stack((batch.yaw, batch.pitch, batch.roll,
+                                  batch.mouth_open_ratio, batch.face_coords))
+        for i, filt in enumerate(self.face_filters):
+            values[i] = filt.update(values[i], ts)
+        self._set_filtered(batch, values)
+
+    def _read(self):
+        with self.profiler.span('capture'):
+            ret, frame, ts, fresh = self.grab()
+        if not ret:
+            return FaceMetricsBatch(), None
+        if not fresh:
+            if self.predicting:
+                return self.predict(time.perf_counter()), self._last_frame
+            return self.cached_result()
+        self.frame_time = ts
+        with self.profiler.span('flip'):
+            frame = cv2.flip(frame, 1)
+        return self.track(frame, ts), frame
+
+    def track(self, frame, ts, img_rgb=None):
+        """Run FaceMesh on a flipped frame or, on skipped frames, predict metrics.
+
+        ``img_rgb`` is converted from ``frame`` only when inference runs and
+        no conversion is supplied.
+        """
+        self._last_frame = frame
+        if not self.should_infer(ts):
+            self._frame_count += 1
+            return self.predict(ts)
+        if img_rgb is None:
+            with self.profiler.span('cvtcolor'):
+                img_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        return self.process(frame, img_rgb)
+
+    def _detect(self, img_rgb, w, h):
+        """Pixel-space METRIC_IDXS landmarks (faces, len(METRIC_IDXS), 3) for the frame.
+
+        Uses ROI crops when tracking. The full mesh is kept for ``landmarks``.
+        """
+        tracker = self.roi_tracker
+        ts = self.frame_time or 0.0
+        if tracker is not None and not tracker.needs_detection(ts):
+            with self.profiler.span('facemesh'):
+                pts = tracker.process(img_rgb)
+            if pts is not None:
+                self._landmark_source = pts
+                return pts[:, METRIC_IDXS]
+        with self.profiler.span('facemesh'):
+            if self.inference_scale < 1.0:
+                # Landmarks are normalised, so they map back to the full frame
+                img_rgb = cv2.resize(img_rgb, None, fx=self.inference_scale,
+                                     fy=self.inference_scale, interpolation=cv2.INTER_AREA)
+            results = self.face_mesh.process(img_rgb)
+        if not results.multi_face_landmarks:
+            if tracker is not None:
+                tracker.reset()
+            self._landmark_source = np.empty((0, 0, 3))
+            return np.empty((0, len(METRIC_IDXS), 3))
+        faces = results.multi_face_landmarks[:self.max_num_faces]
+        if tracker is not None:
+            # ROI boxes span the whole mesh
+            pts = landmarks_to_array(faces, w, h)
+            tracker.start(pts, ts)
+            self._landmark_source = pts
+            return pts[:, METRIC_IDXS]
+        self._landmark_source = (faces, w, h)
+        return landmarks_to_array(faces, w, h, idxs=METRIC_IDXS)
+
+    def process(self, frame, img_rgb):
+        """Run FaceMesh on an already flipped frame and its RGB conversion.
+
+        Returns a FaceMetricsBatch; the mesh overlay is drawn onto ``frame``
+        unless it is disabled or lazy.
+        """
+        if self._pending_quality:
+            self._apply_quality()
+        self._frame_count += 1
+        self._last_infer_time = self.frame_time
         h, w, _ = frame.shape
-        metrics_list = []
-        if results.multi_face_landmarks:
-            for i, face_landmarks in enumerate(results.multi_face_landmarks):
-                # Limit to configured number of faces
-                if i >= self.max_num_faces:
-                    break
-                # Draw mesh
-                self.drawing_utils.draw_landmarks(
-                    frame, face_landmarks, self.mp_face_mesh.FACEMESH_TESSELATION,
-                    landmark_drawing_spec=self.drawing_specs,
-                    connection_drawing_spec=self.drawing_specs
-                )
-                lm = face_landmarks.landmark
-                # Head pose estimation
-                image_points = np.array([
-                    (lm[1].x * w, lm[1].y * h),
-                    (lm[152].x * w, lm[152].y * h),
-                    (lm[33].x * w, lm[33].y * h),
-                    (lm[263].x * w, lm[263].y * h),
-                    (lm[61].x * w, lm[61].y * h),
-                    (lm[291].x * w, lm[291].y * h),
-                ], dtype='double')
-                model_points = np.array([
-                    (0.0, 0.0, 0.0),
-                    (0.0, -63.6, -12.5),
-                    (-43.3, 32.7, -26.0),
-                    (43.3, 32.7, -26.0),
-                    (-28.9, -28.9, -24.1),
-                    (28.9, -28.9, -24.1),
-                ])
-                focal_length = w
-                center = (w / 2, h / 2)
-                camera_matrix = np.array([
-                    [focal_length, 0, center[0]],
-                    [0, focal_length, center[1]],
-                    [0, 0, 1]
-                ], dtype='double')
-                dist_coeffs = np.zeros((4, 1))
-                metrics = {'yaw': 0.0, 'pitch': 0.0, 'roll': 0.0, 'mouth_open_ratio': 0.0}
-                success, rvec, tvec = cv2.solvePnP(
-                    model_points, image_points, camera_matrix, dist_coeffs,
-                    flags=cv2.SOLVEPNP_ITERATIVE
-                )
-                if success:
-                    R, _ = cv2.Rodrigues(rvec)
-                    sy = math.sqrt(R[0, 0]**2 + R[1, 0]**2)
-                    if sy < 1e-6:
-                        x = math.atan2(-R[1, 2], R[1, 1])
-                        y = math.atan2(-R[2, 0], sy)
-                        z = 0
-                    else:
-                        x = math.atan2(R[2, 1], R[2, 2])
-                        y = math.atan2(-R[2, 0], sy)
-                        z = math.atan2(R[1, 0], R[0, 0])
-                    metrics.update({'pitch': x, 'yaw': y, 'roll': z})
-                # Mouth open ratio
-                ul = np.array([lm[13].x * w, lm[13].y * h])
-                ll = np.array([lm[14].x * w, lm[14].y * h])
-                ml = np.array([lm[61].x * w, lm[61].y * h])
-                mr = np.array([lm[291].x * w, lm[291].y * h])
-                vd = np.linalg.norm(ul - ll)
-                hd = np.linalg.norm(ml - mr)
-                if hd > 0:
-                    metrics['mouth_open_ratio'] = vd / hd
-                # Blink detection
-                left_idxs = [33, 160, 158, 133, 153, 144]
-                right_idxs = [362, 385, 387, 263, 373, 380]
-                def ear(idxs):
-                    pts = [(lm[i].x * w, lm[i].y * h) for i in idxs]
-                    p1, p2, p3, p4, p5, p6 = pts
-                    v1 = math.hypot(p2[0] - p6[0], p2[1] - p6[1])
-                    v2 = math.hypot(p3[0] - p5[0], p3[1] - p5[1])
-                    hd = math.hypot(p1[0] - p4[0], p1[1] - p4[1]) or 1e-6
-                    return (v1 + v2) / (2.0 * hd)
-                le = ear(left_idxs)
-                re = ear(right_idxs)
-                ear_avg = (le + re) / 2.0
-                closed = ear_avg < self.blink_threshold
-                # Ensure prev_eyes_closed list is long enough
-                if i >= len(self.prev_eyes_closed):
-                    self.prev_eyes_closed.append(False)
-                blink = self.prev_eyes_closed[i] and not closed
-                self.prev_eyes_closed[i] = closed
-                metrics['eyes_closed'] = closed
-                metrics['blink'] = blink
-                # Record face pixel coordinates (landmark 1 ~ nose tip)
-                coords = (lm[1].x * w, lm[1].y * h)
-                metrics['face_coords'] = coords
-                metrics_list.append(metrics)
-        return metrics_list, frame
+        pts = self._detect(img_rgb, w, h)
+        n = len(pts)
+        batch = FaceMetricsBatch.empty(n)
+        if n:
+            # Derive metrics for all faces in bulk
+            derived = compute_metrics(pts)
+            data = batch.data
+            data['mouth_open_ratio'] = derived['mouth_open_ratio']
+            # Head pose estimation for all faces; failed solves stay at zero
+            with self.profiler.span('solvepnp'):
+                angles, pose_ok = self.pose.estimate(derived['image_points'], w, h)
+            angles = np.where(np.asarray(pose_ok, dtype=bool)[:, None], angles, 0.0)
+            data['pitch'], data['yaw'], data['roll'] = angles.T
+            # Blink: eyes open now after being closed on the last inference
+            closed = derived['ear'].mean(axis=1) < self.blink_threshold
+            data['blink'] = self.prev_eyes_closed[:n] & ~closed
+            data['eyes_closed'] = closed
+            self.prev_eyes_closed[:n] = closed
+            # Face pixel coordinates (landmark 1 ~ nose tip)
+            data['face_coords'] = derived['nose']
+        # Draw mesh unless disabled or deferred to draw_overlay()
+        if not self.lazy_overlay:
+            self.draw_overlay(frame)
+        with self._predict_lock:
+            if self.predicting:
+                self._smooth(batch, self.frame_time)
+            self._last_result = (batch, frame)
+        return batch
 
     def release(self):
-        self.cap.release()
\ No newline at end of file
+        if self._stream is not None:
+            self._stream.close()
+        self.cap.release()
@@ -0,0 +1,57 @@
+import math
+
+import numpy as np
+
+
+def _alpha(cutoff, dt):
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilter:
+    """One Euro filter over a vector of values with linear extrapolation.
+
+    Smooths jitter at low speeds (``min_cutoff``) while following fast motion
+    (``beta``). ``predict(t)`` extrapolates the filtered value along its
+    filtered derivative, so metrics can be filled in between inference frames.
+    """
+
+    def __init__(self, min_cutoff=1.5, beta=0.3, d_cutoff=1.0, max_horizon=0.25):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        # Never extrapolate further than this many seconds past the last sample
+        self.max_horizon = max_horizon
+        self.x = None
+        self.dx = None
+        self.t = None
+
+    def reset(self):
+        self.x = self.dx = self.t = None
+
+    def update(self, value, t):
+        """Feed a measurement taken at time ``t`` (seconds) and return the filtered value."""
+        value = np.asarray(value, dtype=np.float64)
+        if self.x is None:
+            self.x = value.copy()
+            self.dx = np.zeros_like(value)
+            self.t = t
+            return self.x.copy()
+        dt = t - self.t
+        if dt <= 0:
+            return self.x.copy()
+        # Filter the derivative, then use its speed to adapt the value cutoff
+        a_d = _alpha(self.d_cutoff, dt)
+        self.dx = a_d * (value - self.x) / dt + (1 - a_d) * self.dx
+        cutoff = self.min_cutoff + self.beta * np.abs(self.dx)
+        a = _alpha(cutoff, dt)
+        self.x = a * value + (1 - a) * self.x
+        self.t = t
+        return self.x.copy()
+
+    def predict(self, t):
+        """Extrapolate the filtered value to time ``t``."""
+        if self.x is None:
+            return None
+        horizon = min(max(t - self.t, 0.0), self.max_horizon)
+        return self.x + self.dx * horizon
@@ -0,0 +1,111 @@
+from collections import deque, namedtuple
+import time
+
+from face_controls.face import OVERLAY_CONTOURS, OVERLAY_FULL, OVERLAY_OFF
+
+# One quality setting: preview mesh, iris refinement, the scale frames are
+# downscaled by for inference and hand detection every Nth frame. The face
+# cap is never lowered, as FaceMesh would then stop looking for players
+# joining mid-game
+QualityLevel = namedtuple('QualityLevel', 'overlay refine_landmarks inference_scale hands_every')
+
+# Best first; each level gives up a little more than the previous one
+QUALITY_LEVELS = (
+    QualityLevel(OVERLAY_FULL, True, 1.0, 1),
+    QualityLevel(OVERLAY_CONTOURS, False, 1.0, 1),
+    QualityLevel(OVERLAY_CONTOURS, False, 0.75, 2),
+    QualityLevel(OVERLAY_OFF, False, 0.5, 3),
+    QualityLevel(OVERLAY_OFF, False, 0.5, 4),
+)
+
+
+def apply_quality(quality, face=None, pipeline=None):
+    """Apply a QualityLevel to a FaceController and/or a PerceptionPipeline (and its hands).
+
+    Safe to call from the render thread while perception runs on another:
+    FaceMesh changes are queued by ``FaceController.set_quality()``.
+    """
+    if pipeline is not None:
+        face = face or pipeline.face
+        pipeline.hands_every = quality.hands_every
+        pipeline.hands.inference_scale = quality.inference_scale
+    if face is not None:
+        face.overlay = quality.overlay
+        face.set_quality(refine_landmarks=quality.refine_landmarks,
+                         inference_scale=quality.inference_scale)
+
+
+class QualityGovernor:
+    """Step quality down while frames overrun a target rate and back up when headroom returns.
+
+    Call ``update(frame_dt, busy, inference)`` once per frame with the frame
+    time and, optionally, the part of it spent working (excluding any
+    frame-cap sleep, which hides headroom) and the latest inference time of
+    perception running on another thread or process; each frame counts as
+    the slower of rendering and inference. When the mean frame time over ``window``
+    frames exceeds the budget by ``overload``, the next level of ``levels``
+    is passed to ``on_change``; after the busy time has stayed below
+    ``headroom`` of the budget for ``hold`` seconds, the previous level is
+    restored. A level that overloads again soon after being restored
+    doubles the hold (up to ``max_hold``), so the governor settles instead
+    of oscillating between two levels.
+    """
+
+    def __init__(self, target_fps=60, levels=QUALITY_LEVELS, on_change=None, window=30,
+                 overload=1.15, headroom=0.7, hold=3.0, max_hold=60.0, clock=time.perf_counter):
+        self.budget = 1.0 / target_fps
+        self.levels = levels
+        self.level = 0
+        self.on_change = on_change
+        self.overload = overload
+        self.headroom = headroom
+        self.hold = hold
+        self.max_hold = max_hold
+        self.clock = clock
+        self._frame_times = deque(maxlen=window)
+        self._busy_times = deque(maxlen=window)
+        self._headroom_since = None
+        self._raised_at = None
+
+    @property
+    def quality(self):
+        return self.levels[self.level]
+
+    def update(self, frame_dt, busy=None, inference=0.0):
+        """Record one frame; return True if the quality level changed."""
+        busy = frame_dt if busy is None else busy
+        self._frame_times.append(max(frame_dt, inference))
+        self._busy_times.append(max(busy, inference))
+        if len(self._frame_times) < self._frame_times.maxlen:
+            return False
+        now = self.clock()
+        mean = sum(self._frame_times) / len(self._frame_times)
+        if mean > self.budget * self.overload:
+            if self.level == len(self.levels) - 1:
+                return False
+            if self._raised_at is not None and now - self._raised_at < self.hold:
+                # The last step up did not hold: wait longer before the next
+                self.hold = min(self.hold * 2, self.max_hold)
+            self._raised_at = None
+            return self._set(self.level + 1)
+        busy = sum(self._busy_times) / len(self._busy_times)
+        if self.level == 0 or busy >= self.budget * self.headroom:
+            self._headroom_since = None
+            return False
+        if self._headroom_since is None:
+            self._headroom_since = now
+            return False
+        if now - self._headroom_since < self.hold:
+            return False
+        self._raised_at = now
+        return self._set(self.level - 1)
+
+    def _set(self, level):
+        self.level = level
+        # Measure the new level from scratch
+        self._frame_times.clear()
+        self._busy_times.clear()
+        self._headroom_since = None
+        if self.on_change:
+            self.on_change(self.quality)
+        return True
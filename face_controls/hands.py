@@ -0,0 +1,35 @@
+import cv2
+import mediapipe as mp
+
+
+class HandTracker:
+    """MediaPipe Hands wrapper returning wrist positions in pixel space."""
+
+    def __init__(self, max_num_hands=4, detection_confidence=0.5, tracking_confidence=0.5,
+                 inference_scale=1.0):
+        # Frames are downscaled by this factor before detection
+        self.inference_scale = inference_scale
+        self.hands = mp.solutions.hands.Hands(
+            static_image_mode=False,
+            max_num_hands=max_num_hands,
+            min_detection_confidence=detection_confidence,
+            min_tracking_confidence=tracking_confidence
+        )
+
+    def process(self, img_rgb):
+        """Return a list of (x, y) wrist positions for hands in ``img_rgb``."""
+        h, w, _ = img_rgb.shape
+        if self.inference_scale < 1.0:
+            img_rgb = cv2.resize(img_rgb, None, fx=self.inference_scale,
+                                 fy=self.inference_scale, interpolation=cv2.INTER_AREA)
+        results = self.hands.process(img_rgb)
+        hand_positions = []
+        if results.multi_hand_landmarks:
+            for hl in results.multi_hand_landmarks:
+                # wrist landmark (idx 0)
+                wrist = hl.landmark[0]
+                hand_positions.append((int(wrist.x * w), int(wrist.y * h)))
+        return hand_positions
+
+    def close(self):
+        self.hands.close()
@@ -0,0 +1,76 @@
+import numpy as np
+
+# FaceMesh landmark indices used by the metrics below
+NOSE_TIP = 1
+# Nose tip, chin, left/right eye outer corners, left/right mouth corners
+POSE_IDXS = [1, 152, 33, 263, 61, 291]
+# Eye contours ordered p1..p6 for the eye aspect ratio
+LEFT_EYE_IDXS = [33, 160, 158, 133, 153, 144]
+RIGHT_EYE_IDXS = [362, 385, 387, 263, 373, 380]
+EYE_IDXS = np.array([LEFT_EYE_IDXS, RIGHT_EYE_IDXS])
+# Upper lip, lower lip, left and right mouth corners
+MOUTH_IDXS = [13, 14, 61, 291]
+# Every landmark read by the metrics; only these are converted per frame
+METRIC_IDXS = sorted({NOSE_TIP, *POSE_IDXS, *LEFT_EYE_IDXS, *RIGHT_EYE_IDXS, *MOUTH_IDXS})
+# The index lists above as positions in an array of METRIC_IDXS landmarks
+_POSITION = {idx: k for k, idx in enumerate(METRIC_IDXS)}
+_NOSE_TIP = _POSITION[NOSE_TIP]
+_POSE = [_POSITION[i] for i in POSE_IDXS]
+# Point pairs whose distances the metrics need, as (from, to) positions: for
+# each eye p2-p6, p3-p5 and p1-p4, then the lip gap and the mouth width
+_PAIRS = np.array(
+    [(_POSITION[eye[a]], _POSITION[eye[b]])
+     for eye in (LEFT_EYE_IDXS, RIGHT_EYE_IDXS) for a, b in ((1, 5), (2, 4), (0, 3))]
+    + [(_POSITION[MOUTH_IDXS[0]], _POSITION[MOUTH_IDXS[1]]),
+       (_POSITION[MOUTH_IDXS[2]], _POSITION[MOUTH_IDXS[3]])])
+
+
+def landmarks_to_array(multi_face_landmarks, w, h, max_faces=None, idxs=None):
+    """Convert MediaPipe face landmarks to a (faces, N, 3) array in pixel space.
+
+    With ``idxs`` only those landmarks are converted, in that order, e.g.
+    METRIC_IDXS for ``compute_metrics()``. z is scaled by the image width,
+    matching MediaPipe's convention.
+    """
+    faces = multi_face_landmarks[:max_faces] if max_faces else multi_face_landmarks
+    if not faces:
+        return np.empty((0, 0 if idxs is None else len(idxs), 3))
+    if idxs is None:
+        points = (p for f in faces for p in f.landmark)
+    else:
+        points = (p for f in faces for p in map(f.landmark.__getitem__, idxs))
+    # One flat list of floats converts faster than nested tuples
+    pts = np.array([v for p in points for v in (p.x, p.y, p.z)], dtype=np.float64)
+    pts = pts.reshape(len(faces), -1, 3)
+    pts *= (w, h, w)
+    return pts
+
+
+def compute_metrics(pts):
+    """Compute per-face metrics for every face in one batched pass.
+
+    ``pts`` is a (faces, len(METRIC_IDXS), 3) pixel-space array of the
+    METRIC_IDXS landmarks, or the full (faces, N, 3) mesh. Returns a dict of arrays:
+    ``ear`` (faces, 2) left/right eye aspect ratio, ``mouth_open_ratio``
+    (faces,), ``nose`` (faces, 2) and ``image_points`` (faces, 6, 2) for
+    head-pose estimation.
+    """
+    if pts.shape[1] != len(METRIC_IDXS):
+        pts = pts[:, METRIC_IDXS]
+    xy = pts[..., :2]
+    # All distances in one pass, (faces, 8)
+    diff = xy[:, _PAIRS[:, 0]] - xy[:, _PAIRS[:, 1]]
+    dist = np.sqrt((diff * diff).sum(axis=-1))
+    # Eye aspect ratio: (|p2-p6| + |p3-p5|) / (2 |p1-p4|) for both eyes at once
+    eyes = dist[:, :6].reshape(-1, 2, 3)
+    hd = eyes[..., 2]
+    ear = (eyes[..., 0] + eyes[..., 1]) / (2.0 * np.where(hd > 0, hd, 1e-6))
+    # Mouth open ratio: lip gap over mouth width
+    vd, wd = dist[:, 6], dist[:, 7]
+    mouth_ratio = np.divide(vd, wd, out=np.zeros_like(vd), where=wd > 0)
+    return {
+        'ear': ear,
+        'mouth_open_ratio': mouth_ratio,
+        'nose': xy[:, _NOSE_TIP].copy(),
+        'image_points': np.ascontiguousarray(xy[:, _POSE]),
+    }
@@ -0,0 +1,168 @@
+from collections import namedtuple
+
+import numpy as np
+
+# Per-face metrics, in FaceMetrics argument order
+METRICS_DTYPE = np.dtype([
+    ('yaw', '<f8'),
+    ('pitch', '<f8'),
+    ('roll', '<f8'),
+    ('mouth_open_ratio', '<f8'),
+    ('eyes_closed', '?'),
+    ('blink', '?'),
+    ('face_coords', '<f8', (2,)),
+])
+FIELDS = METRICS_DTYPE.names
+# (field, value used when a per-face dict lacks it)
+DEFAULTS = tuple(zip(FIELDS, (0.0, 0.0, 0.0, 0.0, False, False, (0.0, 0.0))))
+
+
+class FaceMetrics:
+    """One face's metrics: head pose in radians, mouth ratio, eye state and nose position.
+
+    Fields are attributes (``metrics.yaw``). For compatibility with the
+    per-face dicts this replaces, it also supports the read/write mapping
+    protocol with the same keys: ``metrics['yaw']``, ``metrics.get('blink')``
+    and ``dict(metrics)``.
+    """
+
+    __slots__ = FIELDS
+
+    def __init__(self, yaw=0.0, pitch=0.0, roll=0.0, mouth_open_ratio=0.0,
+                 eyes_closed=False, blink=False, face_coords=(0.0, 0.0)):
+        self.yaw = yaw
+        self.pitch = pitch
+        self.roll = roll
+        self.mouth_open_ratio = mouth_open_ratio
+        self.eyes_closed = eyes_closed
+        self.blink = blink
+        self.face_coords = face_coords
+
+    def __getitem__(self, key):
+        if key not in FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in FIELDS
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self):
+        return len(FIELDS)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in FIELDS else default
+
+    def keys(self):
+        return FIELDS
+
+    def values(self):
+        return [getattr(self, name) for name in FIELDS]
+
+    def items(self):
+        return [(name, getattr(self, name)) for name in FIELDS]
+
+    def update(self, other=(), **kwargs):
+        for key, value in dict(other, **kwargs).items():
+            self[key] = value
+
+    def replace(self, **changes):
+        """Copy with some fields changed, like ``dict(metrics, blink=False)``."""
+        metrics = FaceMetrics(*self.values())
+        metrics.update(changes)
+        return metrics
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, FaceMetrics):
+            return self.values() == other.values()
+        return NotImplemented
+
+    def __repr__(self):
+        return 'FaceMetrics(%s)' % ', '.join(f'{name}={value!r}' for name, value in self.items())
+
+
+class FaceMetricsBatch:
+    """Metrics of every face in a frame, stored in one NumPy structured array.
+
+    Columns are attributes (``batch.yaw``, ``batch.blink``, ``batch.face_coords``
+    with shape (faces, 2)) for vectorized consumers. Indexing and iteration
+    yield FaceMetrics; slicing returns a batch. Column arrays are views, so
+    writing to them updates the batch.
+    """
+
+    __slots__ = ('data',)
+
+    def __init__(self, data=None):
+        self.data = np.zeros(0, METRICS_DTYPE) if data is None else data
+
+    @classmethod
+    def empty(cls, faces=0):
+        return cls(np.zeros(faces, METRICS_DTYPE))
+
+    @classmethod
+    def from_metrics(cls, metrics_list):
+        """Batch from FaceMetrics or per-face dicts; missing keys are left zero."""
+        if isinstance(metrics_list, cls):
+            return metrics_list
+        rows = [tuple(metrics.get(name, default) for name, default in DEFAULTS)
+                for metrics in metrics_list]
+        return cls(np.array(rows, METRICS_DTYPE))
+
+    def __getattr__(self, name):
+        if name in FIELDS:
+            return self.data[name]
+        raise AttributeError(name)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return FaceMetricsBatch(self.data[i])
+        row = self.data[i]
+        return FaceMetrics(float(row['yaw']), float(row['pitch']), float(row['roll']),
+                           float(row['mouth_open_ratio']), bool(row['eyes_closed']),
+                           bool(row['blink']), tuple(row['face_coords'].tolist()))
+
+    def __iter__(self):
+        for yaw, pitch, roll, mouth, closed, blink, coords in self.data.tolist():
+            yield FaceMetrics(yaw, pitch, roll, mouth, closed, blink, tuple(coords.tolist()))
+
+    def copy(self):
+        return FaceMetricsBatch(self.data.copy())
+
+    def with_blinks(self, blinks):
+        """Copy with the blink column replaced by ``blinks`` (a bool or per-face array)."""
+        batch = self.copy()
+        batch.data['blink'] = blinks
+        return batch
+
+    def without_blinks(self):
+        """Copy with blink events cleared, for repeating a result without re-firing them."""
+        return self.with_blinks(False)
+
+    def to_list(self):
+        return list(self)
+
+    def __repr__(self):
+        return f'FaceMetricsBatch({self.to_list()!r})'
+
+
+def as_batch(metrics_list):
+    """``metrics_list`` as a FaceMetricsBatch, converting lists of FaceMetrics or dicts."""
+    return FaceMetricsBatch.from_metrics(metrics_list)
+
+
+# One perception step: per-face metrics (a FaceMetricsBatch), hand wrist
+# positions, the flipped BGR frame and its capture timestamp
+PerceptionResult = namedtuple('PerceptionResult', 'metrics hands frame timestamp')
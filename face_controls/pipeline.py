@@ -0,0 +1,157 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+import cv2
+
+from face_controls.face import FaceController
+from face_controls.hands import HandTracker
+from face_controls.metrics import FaceMetricsBatch, PerceptionResult
+from face_controls.profiling import NULL_PROFILER
+from face_controls.streams import LATEST, Stamped, Stream, carry_blinks
+
+
+class PerceptionPipeline:
+    """Single perception stage feeding FaceMesh and Hands from one RGB frame.
+
+    Owns the capture through its FaceController, flips and converts each frame
+    once and runs hand detection on the same clean RGB buffer, optionally on a
+    worker thread while FaceMesh runs on the caller's thread.
+    ``inference_time`` is how long the last new frame took to perceive,
+    from the end of its capture to the result.
+    """
+
+    def __init__(self, face=None, hands=None, concurrent=False, profiler=None, hands_every=1):
+        self.face = face or FaceController(profiler=profiler)
+        self.hands = hands or HandTracker()
+        self._executor = ThreadPoolExecutor(max_workers=1) if concurrent else None
+        self._last_hands = []
+        # Run hand detection on every Nth new frame, reusing positions in between
+        self.hands_every = hands_every
+        self._hand_frames = 0
+        self.inference_time = 0.0
+        # Timing spans for capture, flip, colour conversion and Hands; FaceMesh
+        # and solvePnP are timed by the FaceController's own profiler
+        self.profiler = profiler or NULL_PROFILER
+        self._stream = None
+
+    def stream(self, policy=LATEST, maxsize=1):
+        """Subscribe to Stamped('perception') items holding a PerceptionResult.
+
+        Like FaceController.stream(): one background thread runs face and
+        hand detection for all subscribers.
+        """
+        if self._stream is None:
+            self._stream = Stream(self._next_stamped, 'perception', coalesce=carry_blinks)
+        return self._stream.subscribe(policy, maxsize)
+
+    def _next_stamped(self):
+        result = self.read(wait=True)
+        if result.frame is None:
+            if self.face.threaded and self.face.cap.active:
+                return None
+            raise StopIteration
+        return Stamped(result.timestamp, 'perception', result, result.frame)
+
+    def _process_hands(self, img_rgb):
+        with self.profiler.span('hands'):
+            return self.hands.process(img_rgb)
+
+    def read(self, wait=False):
+        """Perceive the latest frame; ``wait=True`` first waits for a new one."""
+        profiler = self.profiler
+        with profiler.span('capture'):
+            ret, frame, ts, fresh = self.face.grab(wait)
+        if not ret:
+            return PerceptionResult(FaceMetricsBatch(), [], None, ts)
+        if not fresh:
+            if self.face.predicting:
+                now = time.perf_counter()
+                return PerceptionResult(self.face.predict(now), self._last_hands,
+                                        self.face._last_frame, now)
+            metrics_list, frame = self.face.cached_result()
+            return PerceptionResult(metrics_list, self._last_hands, frame, self.face.frame_time)
+        start = time.perf_counter()
+        self.face.frame_time = ts
+        with profiler.span('flip'):
+            frame = cv2.flip(frame, 1)
+        with profiler.span('cvtcolor'):
+            img_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        run_hands = self._hand_frames % max(1, self.hands_every) == 0
+        self._hand_frames += 1
+        if not run_hands:
+            hand_positions = self._last_hands
+            metrics_list = self.face.track(frame, ts, img_rgb)
+        elif self._executor:
+            hands_future = self._executor.submit(self._process_hands, img_rgb)
+            metrics_list = self.face.track(frame, ts, img_rgb)
+            hand_positions = hands_future.result()
+        else:
+            hand_positions = self._process_hands(img_rgb)
+            metrics_list = self.face.track(frame, ts, img_rgb)
+        self._last_hands = hand_positions
+        self.inference_time = time.perf_counter() - start
+        return PerceptionResult(metrics_list, hand_positions, frame, ts)
+
+    def release(self):
+        if self._stream is not None:
+            self._stream.close()
+        if self._executor:
+            self._executor.shutdown(wait=True)
+        self.hands.close()
+        self.face.release()
+
+
+class PerceptionThread:
+    """Run a PerceptionPipeline on a background thread, keeping only its latest result.
+
+    ``read()`` never waits on the camera or inference: it returns the newest
+    result or, when no new result has arrived, the previous one with blink
+    events cleared and, if the FaceController is predicting, its metrics
+    extrapolated to the current time. Blinks from results that were
+    overwritten before being read are carried into the next one, so none
+    are lost when the caller runs slower than perception.
+    """
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        self._result = PerceptionResult(FaceMetricsBatch(), [], None, 0.0)
+        self._seq = 0
+        self._taken = 0
+        self._lock = threading.Lock()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='PerceptionThread', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while self._running:
+            result = self.pipeline.read(wait=True)
+            if result.frame is None:
+                # Capture failed or ended; avoid spinning
+                time.sleep(0.01)
+            with self._lock:
+                if self._seq != self._taken:
+                    prev = self._result.metrics
+                    n = min(len(result.metrics), len(prev))
+                    result.metrics.blink[:n] |= prev.blink[:n]
+                self._result = result
+                self._seq += 1
+
+    def read(self):
+        with self._lock:
+            result, seq = self._result, self._seq
+            fresh = seq != self._taken
+            self._taken = seq
+        if fresh:
+            return result
+        face = self.pipeline.face
+        if face.predicting:
+            # Motion between camera frames from the One Euro filters
+            now = time.perf_counter()
+            return result._replace(metrics=face.predict(now), timestamp=now)
+        return result._replace(metrics=result.metrics.without_blinks())
+
+    def release(self):
+        self._running = False
+        self._thread.join(timeout=1.0)
+        self.pipeline.release()
@@ -0,0 +1,153 @@
+import os
+
+import cv2
+import numpy as np
+
+# 3D reference points (mm) matching landmarks.POSE_IDXS: nose tip, chin,
+# left/right eye outer corners, left/right mouth corners
+MODEL_POINTS = np.array([
+    (0.0, 0.0, 0.0),
+    (0.0, -63.6, -12.5),
+    (-43.3, 32.7, -26.0),
+    (43.3, 32.7, -26.0),
+    (-28.9, -28.9, -24.1),
+    (28.9, -28.9, -24.1),
+])
+
+SOLVERS = {
+    'iterative': cv2.SOLVEPNP_ITERATIVE,
+    'epnp': cv2.SOLVEPNP_EPNP,
+    'sqpnp': cv2.SOLVEPNP_SQPNP,
+}
+
+
+def load_calibration(path):
+    """Load (camera_matrix, dist_coeffs, image_size) from a calibration file.
+
+    Accepts an ``.npz`` (keys ``camera_matrix``/``dist_coeffs`` or OpenCV's
+    ``mtx``/``dist``) or any cv2.FileStorage file (YAML/XML/JSON) with
+    ``camera_matrix`` and ``dist_coeffs`` nodes. ``image_size`` is the
+    (width, height) the calibration was made at, or None if not recorded.
+    """
+    if os.path.splitext(path)[1].lower() == '.npz':
+        data = np.load(path)
+        camera_matrix = data['camera_matrix'] if 'camera_matrix' in data else data['mtx']
+        dist_coeffs = data['dist_coeffs'] if 'dist_coeffs' in data else data['dist']
+        image_size = tuple(int(v) for v in data['image_size']) if 'image_size' in data else None
+    else:
+        fs = cv2.FileStorage(path, cv2.FILE_STORAGE_READ)
+        if not fs.isOpened():
+            raise FileNotFoundError(path)
+        camera_matrix = fs.getNode('camera_matrix').mat()
+        dist_coeffs = fs.getNode('dist_coeffs').mat()
+        width = fs.getNode('image_width')
+        height = fs.getNode('image_height')
+        image_size = None
+        if not width.empty() and not height.empty():
+            image_size = (int(width.real()), int(height.real()))
+        fs.release()
+    if camera_matrix is None or dist_coeffs is None:
+        raise ValueError(f"Calibration file {path} lacks camera_matrix/dist_coeffs")
+    return (np.asarray(camera_matrix, dtype='double').reshape(3, 3),
+            np.asarray(dist_coeffs, dtype='double').reshape(-1, 1), image_size)
+
+
+def rotation_vectors_to_euler(rvecs):
+    """Convert (faces, 3) Rodrigues vectors to (faces, 3) pitch, yaw, roll angles."""
+    rvecs = np.asarray(rvecs, dtype=np.float64).reshape(-1, 3)
+    theta = np.linalg.norm(rvecs, axis=1)
+    k = rvecs / np.where(theta > 1e-12, theta, 1.0)[:, None]
+    kx, ky, kz = k.T
+    zero = np.zeros_like(kx)
+    # Rodrigues: R = I + sin(t) K + (1 - cos(t)) K^2, batched
+    K = np.stack([
+        np.stack([zero, -kz, ky], axis=-1),
+        np.stack([kz, zero, -kx], axis=-1),
+        np.stack([-ky, kx, zero], axis=-1),
+    ], axis=1)
+    s = np.sin(theta)[:, None, None]
+    c = (1 - np.cos(theta))[:, None, None]
+    R = np.eye(3) + s * K + c * (K @ K)
+    sy = np.hypot(R[:, 0, 0], R[:, 1, 0])
+    singular = sy < 1e-6
+    pitch = np.where(singular, np.arctan2(-R[:, 1, 2], R[:, 1, 1]),
+                     np.arctan2(R[:, 2, 1], R[:, 2, 2]))
+    yaw = np.arctan2(-R[:, 2, 0], sy)
+    roll = np.where(singular, 0.0, np.arctan2(R[:, 1, 0], R[:, 0, 0]))
+    return np.stack([pitch, yaw, roll], axis=1)
+
+
+class HeadPoseEstimator:
+    """Head pose from the six pose landmarks of every face in a frame.
+
+    Camera intrinsics are built once per resolution (from a calibration file
+    when given, else ``focal_length = width``), and with the iterative solver
+    each face slot warm-starts from its previous rvec/tvec.
+    """
+
+    def __init__(self, calibration=None, solver='iterative', warm_start=True):
+        if solver not in SOLVERS:
+            raise ValueError(f"Unknown PnP solver: {solver}")
+        self.solver = solver
+        self.flags = SOLVERS[solver]
+        self.warm_start = warm_start and solver == 'iterative'
+        self.calibration = load_calibration(calibration) if calibration else None
+        self._intrinsics = {}
+        # Previous (rvec, tvec) per face slot
+        self._prev = []
+
+    def intrinsics(self, w, h):
+        """Cached (camera_matrix, dist_coeffs) for a w x h image."""
+        key = (w, h)
+        if key not in self._intrinsics:
+            if self.calibration is not None:
+                camera_matrix, dist_coeffs, size = self.calibration
+                camera_matrix = camera_matrix.copy()
+                if size and size != key:
+                    # Scale calibrated intrinsics to the capture resolution
+                    camera_matrix[0] *= w / size[0]
+                    camera_matrix[1] *= h / size[1]
+            else:
+                camera_matrix = np.array([
+                    [w, 0, w / 2],
+                    [0, w, h / 2],
+                    [0, 0, 1]
+                ], dtype='double')
+                dist_coeffs = np.zeros((4, 1))
+            self._intrinsics[key] = (camera_matrix, dist_coeffs)
+        return self._intrinsics[key]
+
+    def reset(self):
+        self._prev = []
+
+    def estimate(self, image_points, w, h):
+        """Solve pose for (faces, 6, 2) image points.
+
+        Returns ``(angles, ok)``: a (faces, 3) pitch/yaw/roll array in radians
+        and a boolean success mask.
+        """
+        camera_matrix, dist_coeffs = self.intrinsics(w, h)
+        n = len(image_points)
+        if len(self._prev) != n:
+            # Face slots changed: previous guesses may belong to other faces
+            self._prev = [None] * n
+        rvecs = np.zeros((n, 3))
+        ok = np.zeros(n, dtype=bool)
+        for i, pts in enumerate(image_points):
+            guess = self._prev[i] if self.warm_start else None
+            if guess is not None:
+                success, rvec, tvec = cv2.solvePnP(
+                    MODEL_POINTS, pts, camera_matrix, dist_coeffs,
+                    guess[0].copy(), guess[1].copy(), useExtrinsicGuess=True, flags=self.flags
+                )
+            else:
+                success, rvec, tvec = cv2.solvePnP(
+                    MODEL_POINTS, pts, camera_matrix, dist_coeffs, flags=self.flags
+                )
+            if success:
+                rvecs[i] = rvec.ravel()
+                ok[i] = True
+                self._prev[i] = (rvec, tvec)
+            else:
+                self._prev[i] = None
+        return rotation_vectors_to_euler(rvecs), ok
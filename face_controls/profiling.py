@@ -0,0 +1,140 @@
+from collections import deque
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+PERCENTILES = (50, 95, 99)
+
+
+class _Span:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, self.start, time.perf_counter_ns())
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Profiler:
+    """Named timing spans with rolling percentiles and Chrome trace export.
+
+    ``with profiler.span('facemesh'): ...`` times a block; the last ``window``
+    durations of each span name feed ``stats()`` (mean/p50/p95/p99 in ms).
+    With ``trace=True`` every span is also kept (up to ``max_events``) as a
+    Chrome trace event for ``export_chrome_trace()``, viewable in
+    chrome://tracing or Perfetto. Spans may be recorded from any thread.
+    ``counter(name, value)`` records the latest value of a counter, such
+    as live projectiles, traced as a counter track.
+    """
+
+    enabled = True
+
+    def __init__(self, window=240, trace=False, max_events=200000):
+        self.window = window
+        self.durations = {}
+        self.counters = {}
+        self.events = deque(maxlen=max_events) if trace else None
+        self.counter_events = deque(maxlen=max_events) if trace else None
+        self._origin = time.perf_counter_ns()
+
+    def span(self, name):
+        return _Span(self, name)
+
+    def add(self, name, start_ns, end_ns):
+        """Record a span measured with ``time.perf_counter_ns()``."""
+        durations = self.durations.get(name)
+        if durations is None:
+            durations = self.durations.setdefault(name, deque(maxlen=self.window))
+        durations.append(end_ns - start_ns)
+        if self.events is not None:
+            self.events.append((name, start_ns, end_ns - start_ns, threading.get_ident()))
+
+    def counter(self, name, value):
+        if self.counters.get(name) == value:
+            return
+        self.counters[name] = value
+        if self.counter_events is not None:
+            self.counter_events.append((name, time.perf_counter_ns(), value))
+
+    def stats(self):
+        """{name: {'mean', 'p50', 'p95', 'p99', 'count'}} in milliseconds."""
+        stats = {}
+        for name, durations in list(self.durations.items()):
+            if not durations:
+                continue
+            ms = np.array(durations, dtype=np.float64) / 1e6
+            stats[name] = {'mean': float(ms.mean()), 'count': len(ms)}
+            for p, v in zip(PERCENTILES, np.percentile(ms, PERCENTILES)):
+                stats[name][f'p{p}'] = float(v)
+        return stats
+
+    def reset(self):
+        self.durations.clear()
+        self.counters.clear()
+        if self.events is not None:
+            self.events.clear()
+            self.counter_events.clear()
+
+    def chrome_trace(self):
+        """Recorded spans and counters as a Chrome trace-event dict ('X' and 'C' events)."""
+        pid = os.getpid()
+        events = [{'name': name, 'ph': 'X', 'pid': pid, 'tid': tid,
+                   'ts': (start - self._origin) / 1000.0, 'dur': dur / 1000.0}
+                  for name, start, dur, tid in list(self.events or ())]
+        events += [{'name': name, 'ph': 'C', 'pid': pid, 'ts': (ts - self._origin) / 1000.0,
+                    'args': {name: value}}
+                   for name, ts, value in list(self.counter_events or ())]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export_chrome_trace(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f)
+
+
+class NullProfiler:
+    """Disabled profiler: spans are a shared no-op context manager."""
+
+    enabled = False
+    durations = {}
+    counters = {}
+
+    def span(self, name):
+        return _NULL_SPAN
+
+    def add(self, name, start_ns, end_ns):
+        pass
+
+    def counter(self, name, value):
+        pass
+
+    def stats(self):
+        return {}
+
+    def reset(self):
+        pass
+
+
+# Shared default for components created without a profiler
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,232 @@
+import os
+import struct
+import time
+
+import numpy as np
+
+from face_controls.metrics import FIELDS, FaceMetricsBatch, PerceptionResult, as_batch
+
+# File header: magic, max faces and max hands per record, whether a world
+# seed was recorded and the seed
+MAGIC = b'FCREC3\0\0'
+HEADER = struct.Struct('<8sHH?3xq')
+
+# Bits of a record's ``events``: input, besides perception, that changes the
+# game and has to be replayed
+EVENT_PORTAL = 1  # P key: open an Elder Dimension portal
+
+# One face slot of a record; values keep full precision so a replay feeds
+# the simulation exactly what the live run did
+FACE_DTYPE = np.dtype([
+    ('yaw', '<f8'),
+    ('pitch', '<f8'),
+    ('roll', '<f8'),
+    ('mouth_open_ratio', '<f8'),
+    ('face_coords', '<f8', (2,)),
+    ('eyes_closed', 'u1'),
+    ('blink', 'u1'),
+])
+
+
+def record_dtype(max_faces=4, max_hands=4):
+    """Fixed-size record holding one perception step."""
+    return np.dtype([
+        ('timestamp', '<f8'),
+        ('amp', '<f8'),
+        ('n_faces', 'u1'),
+        ('n_hands', 'u1'),
+        ('events', 'u1'),
+        ('faces', FACE_DTYPE, (max_faces,)),
+        ('hands', '<i2', (max_hands, 2)),
+    ])
+
+
+def fill_record(rec, timestamp, metrics_list, hands=(), amp=0.0, events=0):
+    """Write one perception step into record ``rec`` (a ``record_dtype`` scalar view).
+
+    ``metrics_list`` is a FaceMetricsBatch or a list of FaceMetrics or dicts;
+    ``events`` is a mask of EVENT_* bits.
+    """
+    faces = rec['faces']
+    rec['timestamp'] = timestamp
+    rec['amp'] = amp
+    rec['events'] = events
+    faces[:] = 0
+    batch = as_batch(metrics_list)[:len(faces)]
+    n = len(batch)
+    for name in FIELDS:
+        faces[name][:n] = batch.data[name]
+    rec['n_faces'] = n
+    hands = list(hands)[:len(rec['hands'])]
+    rec['hands'][:] = 0
+    if hands:
+        rec['hands'][:len(hands)] = hands
+    rec['n_hands'] = len(hands)
+
+
+def record_metrics(rec):
+    """(FaceMetricsBatch, hands) decoded from record ``rec``."""
+    faces = rec['faces'][:int(rec['n_faces'])]
+    batch = FaceMetricsBatch.empty(len(faces))
+    for name in FIELDS:
+        batch.data[name] = faces[name]
+    hands = [tuple(h) for h in rec['hands'][:rec['n_hands']].tolist()]
+    return batch, hands
+
+
+class PerceptionRecorder:
+    """Write face metrics, wrist positions, voice RMS, game events and timestamps to a file.
+
+    Every perception step becomes one fixed-size little-endian record (see
+    ``record_dtype``) so a recording can be memory-mapped and indexed without
+    parsing. Faces and hands beyond ``max_faces``/``max_hands`` are dropped.
+    Records are buffered and written ``flush_every`` at a time. ``seed``, the
+    game world's seed, is stored in the header for the replay to reuse.
+    """
+
+    def __init__(self, path, max_faces=4, max_hands=4, flush_every=64, seed=None):
+        self.dtype = record_dtype(max_faces, max_hands)
+        self.max_faces = max_faces
+        self.max_hands = max_hands
+        self.seed = seed
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, max_faces, max_hands, seed is not None, seed or 0))
+        self._buffer = np.zeros(flush_every, dtype=self.dtype)
+        self._pending = 0
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, timestamp, metrics_list, hands=(), amp=0.0, events=0):
+        fill_record(self._buffer[self._pending], timestamp, metrics_list, hands, amp, events)
+        self._pending += 1
+        self.count += 1
+        if self._pending == len(self._buffer):
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            self._file.write(self._buffer[:self._pending].tobytes())
+            self._pending = 0
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+class PerceptionReplay:
+    """Memory-mapped replay of a PerceptionRecorder file.
+
+    ``read()`` mirrors ``PerceptionPipeline.read()`` (with no frame) and
+    returns every record in turn, one per call. With ``speed`` > 0 a record
+    is held back until its recorded time has been reached at ``speed``
+    times real time, and the previous one is repeated without blinks in the
+    meantime; a caller that falls behind plays the records late rather than
+    skipping any, so the replayed inputs are the recorded ones whatever the
+    speed. With ``speed=0`` records are returned as fast as the caller
+    reads. ``amp`` holds the voice level of the last record read, ``events``
+    its EVENT_* mask (0 while a record is repeated) and ``finished`` is set
+    once the stream ends (unless ``loop``). ``seed`` is the recorded world
+    seed, or None.
+    """
+
+    def __init__(self, path, speed=1.0, loop=False):
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+        if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a perception recording")
+        _, max_faces, max_hands, has_seed, seed = HEADER.unpack(header)
+        self.seed = seed if has_seed else None
+        self.dtype = record_dtype(max_faces, max_hands)
+        # A truncated trailing record (e.g. after a crash) is ignored
+        count = (os.path.getsize(path) - HEADER.size) // self.dtype.itemsize
+        if count:
+            self.records = np.memmap(path, dtype=self.dtype, mode='r',
+                                     offset=HEADER.size, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=self.dtype)
+        self.timestamps = self.records['timestamp']
+        self.speed = speed
+        self.loop = loop
+        self.pos = 0
+        self.amp = 0.0
+        self.events = 0
+        self.finished = False
+        self._start = None
+        self._last = None
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, i):
+        """Return PerceptionResult for record ``i``."""
+        rec = self.records[i]
+        metrics_list, hands = record_metrics(rec)
+        return PerceptionResult(metrics_list, hands, None, float(rec['timestamp']))
+
+    def amp_at(self, i):
+        return float(self.records[i]['amp'])
+
+    def rewind(self):
+        self.pos = 0
+        self.finished = False
+        self._start = None
+        self._last = None
+
+    def read(self):
+        n = len(self.records)
+        if self.pos >= n:
+            if not self.loop or not n:
+                self.finished = True
+                return PerceptionResult(FaceMetricsBatch(), [], None, time.perf_counter())
+            self.rewind()
+        i = self.pos
+        if self.speed:
+            now = time.perf_counter()
+            if self._start is None:
+                self._start = now - (self.timestamps[i] - self.timestamps[0]) / self.speed
+            # Point reached on the (scaled) timeline
+            due = self.timestamps[0] + (now - self._start) * self.speed
+            if self.timestamps[i] > due and self._last is not None:
+                # Nothing new yet: repeat the last step without re-firing blinks
+                self.events = 0
+                metrics_list, hands, _, ts = self._last
+                return PerceptionResult(metrics_list.without_blinks(), hands, None, ts)
+        result = self[i]
+        self.pos = i + 1
+        self.amp = self.amp_at(i)
+        self.events = int(self.records[i]['events'])
+        self._last = result
+        return result
+
+    def release(self):
+        self.finished = True
+        self.records = np.zeros(0, dtype=self.dtype)
+        self.timestamps = self.records['timestamp']
+
+
+class ReplayVoice:
+    """VoiceController stand-in that reports a replay's recorded voice level."""
+
+    def __init__(self, replay, threshold=500):
+        self.replay = replay
+        self.threshold = threshold
+        self.speaking = False
+
+    def read(self):
+        return self.replay.amp
+
+    def speak(self, text):
+        pass
+
+    def stop_speaking(self):
+        pass
+
+    def close(self):
+        pass
@@ -0,0 +1,88 @@
+import cv2
+import numpy as np
+
+from face_controls.landmarks import landmarks_to_array
+
+
+class RoiTracker:
+    """Run face landmarking on small crops around previously tracked faces.
+
+    Each tracked face keeps its bounding box from the last frame and its own
+    single-face FaceMesh instance. The next frame is landmarked on an expanded
+    square crop around that box, downscaled to at most ``crop_size`` pixels,
+    and the landmarks are mapped back to full-frame pixel space. The caller
+    falls back to full-frame detection whenever a track is lost or
+    ``redetect_interval`` seconds have passed, so new faces are still found.
+    """
+
+    def __init__(self, make_mesh, crop_size=256, expand=1.8, redetect_interval=1.0):
+        # Factory returning a FaceMesh configured for a single face
+        self.make_mesh = make_mesh
+        self.crop_size = crop_size
+        self.expand = expand
+        self.redetect_interval = redetect_interval
+        self.meshes = []
+        self.boxes = []
+        self.last_detect_time = None
+
+    def needs_detection(self, ts):
+        """Whether the frame at ``ts`` should run full-frame detection instead."""
+        if not self.boxes or self.last_detect_time is None:
+            return True
+        return ts - self.last_detect_time >= self.redetect_interval
+
+    def start(self, pts, ts):
+        """(Re)start tracks from full-frame landmarks of shape (faces, N, 3)."""
+        self.boxes = [self._box(face) for face in pts]
+        while len(self.meshes) < len(self.boxes):
+            self.meshes.append(self.make_mesh())
+        self.last_detect_time = ts
+
+    def reset(self):
+        self.boxes = []
+
+    def process(self, img_rgb):
+        """Landmark every tracked face on its crop.
+
+        Returns a (faces, N, 3) pixel-space array, or None when any track was
+        lost and full-frame detection is needed.
+        """
+        h, w, _ = img_rgb.shape
+        faces = []
+        for i, box in enumerate(self.boxes):
+            x0, y0, x1, y1 = self._crop_rect(box, w, h)
+            crop = img_rgb[y0:y1, x0:x1]
+            cw, ch = x1 - x0, y1 - y0
+            if cw < 2 or ch < 2:
+                self.reset()
+                return None
+            scale = self.crop_size / max(cw, ch)
+            if scale < 1.0:
+                crop = cv2.resize(crop, (max(1, int(cw * scale)), max(1, int(ch * scale))),
+                                  interpolation=cv2.INTER_AREA)
+            results = self.meshes[i].process(np.ascontiguousarray(crop))
+            if not results.multi_face_landmarks:
+                # Tracking lost: the per-crop mesh found no face
+                self.reset()
+                return None
+            # Normalised crop coordinates back to full-frame pixels
+            pts = landmarks_to_array(results.multi_face_landmarks[:1], cw, ch)[0]
+            pts[:, 0] += x0
+            pts[:, 1] += y0
+            faces.append(pts)
+        self.boxes = [self._box(face) for face in faces]
+        return np.stack(faces) if faces else None
+
+    @staticmethod
+    def _box(pts):
+        x0, y0 = pts[:, :2].min(axis=0)
+        x1, y1 = pts[:, :2].max(axis=0)
+        return x0, y0, x1, y1
+
+    def _crop_rect(self, box, w, h):
+        # Expanded square around the box, clipped to the frame
+        x0, y0, x1, y1 = box
+        cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+        half = max(x1 - x0, y1 - y0) * self.expand / 2
+        return (max(0, int(cx - half)), max(0, int(cy - half)),
+                min(w, int(cx + half)), min(h, int(cy + half)))
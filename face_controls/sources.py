@@ -0,0 +1,162 @@
+import abc
+import glob
+import os
+import time
+
+import cv2
+
+# Extensions picked up by ImageSequenceSource
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+class FrameSource(abc.ABC):
+    """Base for non-camera frame sources with a cv2.VideoCapture-like API.
+
+    Subclasses implement ``_next()`` returning a BGR frame or None when
+    exhausted. With ``fps`` set, ``read()`` paces frames to that rate like a
+    live camera; otherwise frames are returned as fast as they are requested.
+    """
+
+    def __init__(self, fps=None, loop=False):
+        self.fps = fps
+        self.loop = loop
+        self._opened = True
+        self._next_time = None
+
+    @abc.abstractmethod
+    def _next(self):
+        """Next BGR frame, or None when the source is exhausted."""
+
+    def _rewind(self):
+        return False
+
+    def read(self):
+        if not self._opened:
+            return False, None
+        frame = self._next()
+        if frame is None and self.loop and self._rewind():
+            frame = self._next()
+        if frame is None:
+            return False, None
+        if self.fps:
+            now = time.perf_counter()
+            if self._next_time is None:
+                self._next_time = now
+            delay = self._next_time - now
+            if delay > 0:
+                time.sleep(delay)
+            self._next_time = max(self._next_time, now) + 1.0 / self.fps
+        return True, frame
+
+    def isOpened(self):
+        return self._opened
+
+    def release(self):
+        self._opened = False
+
+    def __iter__(self):
+        while True:
+            ret, frame = self.read()
+            if not ret:
+                return
+            yield frame
+
+
+class VideoFileSource(FrameSource):
+    """Frames decoded from a video file; ``realtime`` paces at the file's FPS."""
+
+    def __init__(self, path, loop=False, realtime=False):
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise IOError(f"Cannot open video file: {path}")
+        fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        super().__init__(fps if realtime else None, loop)
+
+    def _next(self):
+        ret, frame = self.cap.read()
+        return frame if ret else None
+
+    def _rewind(self):
+        return self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def __len__(self):
+        return int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+    def release(self):
+        super().release()
+        self.cap.release()
+
+
+class ImageSequenceSource(FrameSource):
+    """Frames read from the images in a directory (or matching a glob), sorted by name."""
+
+    def __init__(self, path, fps=None, loop=False):
+        super().__init__(fps, loop)
+        if os.path.isdir(path):
+            paths = [os.path.join(path, p) for p in os.listdir(path)
+                     if p.lower().endswith(IMAGE_EXTENSIONS)]
+        else:
+            paths = glob.glob(path)
+        self.paths = sorted(paths)
+        if not self.paths:
+            raise IOError(f"No images found at: {path}")
+        self.index = 0
+
+    def _next(self):
+        while self.index < len(self.paths):
+            frame = cv2.imread(self.paths[self.index])
+            self.index += 1
+            if frame is not None:
+                return frame
+        return None
+
+    def _rewind(self):
+        self.index = 0
+        return True
+
+    def __len__(self):
+        return len(self.paths)
+
+
+class ArraySource(FrameSource):
+    """Frames from an in-memory sequence or generator of BGR NumPy arrays.
+
+    Sequences (lists, (N, H, W, 3) arrays) can loop; generators are consumed
+    once.
+    """
+
+    def __init__(self, frames, fps=None, loop=False):
+        super().__init__(fps, loop)
+        self.frames = frames
+        self._iter = iter(frames)
+
+    def _next(self):
+        return next(self._iter, None)
+
+    def _rewind(self):
+        if iter(self.frames) is self.frames:
+            return False
+        self._iter = iter(self.frames)
+        return True
+
+
+def open_source(source):
+    """Open ``source`` as a frame source.
+
+    Accepts a camera index, a video file path, a directory (or glob) of
+    images, an object that already has ``read()`` (a cv2.VideoCapture or
+    FrameSource), or a sequence/generator of NumPy frames.
+    """
+    if hasattr(source, 'read'):
+        return source
+    if isinstance(source, int):
+        return cv2.VideoCapture(source)
+    if isinstance(source, (str, os.PathLike)):
+        path = os.fspath(source)
+        if os.path.isdir(path) or glob.has_magic(path):
+            return ImageSequenceSource(path)
+        if os.path.isfile(path):
+            return VideoFileSource(path)
+        # Anything else OpenCV can open: streams, device paths
+        return cv2.VideoCapture(path)
+    return ArraySource(source)
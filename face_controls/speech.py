@@ -0,0 +1,86 @@
+import queue
+import threading
+
+import pyttsx3
+
+
+class SpeechWorker:
+    """Speak text on a background thread so callers never block on TTS.
+
+    Phrases go through a bounded queue (the oldest pending phrase is dropped
+    when it is full). ``cancel()`` discards pending phrases and interrupts the
+    current one at the next word boundary. The pyttsx3 engine is created on the
+    worker thread because its drivers are bound to the thread that runs them.
+    """
+
+    def __init__(self, max_queue=4):
+        self.queue = queue.Queue(max_queue)
+        self._speaking = threading.Event()
+        # Bumped by cancel(); phrases queued under an older generation are skipped
+        self._generation = 0
+        self._current = 0
+        self._engine = None
+        self._thread = threading.Thread(target=self._run, name='SpeechWorker', daemon=True)
+        self._thread.start()
+
+    @property
+    def speaking(self):
+        """True while a phrase is being spoken."""
+        return self._speaking.is_set()
+
+    @property
+    def busy(self):
+        """True while speaking or with phrases still queued."""
+        return self.speaking or not self.queue.empty()
+
+    def say(self, text):
+        item = (self._generation, text)
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            # Drop the oldest pending phrase to make room
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.queue.put_nowait(item)
+
+    def cancel(self):
+        """Drop queued phrases and interrupt the one being spoken."""
+        self._generation += 1
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                break
+
+    def _on_word(self, name, location, length):
+        # Runs inside runAndWait() on the worker thread
+        if self._current != self._generation:
+            self._engine.stop()
+
+    def _run(self):
+        self._engine = pyttsx3.init()
+        self._engine.connect('started-word', self._on_word)
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            generation, text = item
+            if generation != self._generation:
+                continue
+            self._current = generation
+            self._speaking.set()
+            try:
+                self._engine.say(text)
+                self._engine.runAndWait()
+            finally:
+                self._speaking.clear()
+
+    def close(self, timeout=1.0):
+        self.cancel()
+        try:
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout=timeout)
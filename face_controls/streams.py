@@ -0,0 +1,264 @@
+from collections import deque, namedtuple
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+
+# Backpressure policies for a subscriber that falls behind its source
+LATEST = 'latest'            # keep only the newest item
+DROP_OLDEST = 'drop_oldest'  # bounded queue that discards its oldest item when full
+BLOCK = 'block'              # bounded queue that stalls the source when full
+POLICIES = (LATEST, DROP_OLDEST, BLOCK)
+
+# One result from a named source, stamped in time.perf_counter() seconds;
+# frame is the BGR image the result came from, if any
+Stamped = namedtuple('Stamped', 'timestamp source value frame', defaults=(None,))
+
+
+class StreamClosed(Exception):
+    """Raised by ``get()`` once a stream has ended and been drained."""
+
+
+def carry_blinks(dropped, item):
+    """Coalesce face results: blinks of a dropped item are kept in the item replacing it.
+
+    Works for values that are a FaceMetricsBatch or carry one as ``.metrics``
+    (a PerceptionResult). Every subscriber receives the same item, so the
+    blinks go into a copy rather than the item itself.
+    """
+    old = getattr(dropped.value, 'metrics', dropped.value)
+    if not old.blink.any():
+        return item
+    value = item.value
+    new = getattr(value, 'metrics', value).copy()
+    n = min(len(old), len(new))
+    new.blink[:n] |= old.blink[:n]
+    if hasattr(value, 'metrics'):
+        return item._replace(value=value._replace(metrics=new))
+    return item._replace(value=new)
+
+
+class _Iterable:
+    """Sync and async iteration over a blocking ``get(timeout)``."""
+
+    # Seconds an async iteration step waits in the executor before rechecking
+    poll = 0.1
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return self.get()
+        except StreamClosed:
+            raise StopIteration from None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                item = await loop.run_in_executor(None, self.get, self.poll)
+            except StreamClosed:
+                raise StopAsyncIteration from None
+            if item is not None:
+                return item
+
+
+class Subscription(_Iterable):
+    """One consumer's queue of stream items, filled from the source's thread.
+
+    ``policy`` decides what happens when the consumer falls behind: LATEST
+    keeps only the newest item, DROP_OLDEST keeps the newest ``maxsize``
+    and BLOCK makes the source wait for room (stalling every subscriber of
+    that source). When an item is dropped, ``coalesce(dropped, item)``
+    folds it into the item taking its place, so events such as blinks
+    survive. Iterate it with ``for`` or ``async for``.
+    """
+
+    def __init__(self, policy=LATEST, maxsize=1, coalesce=None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown backpressure policy: {policy}")
+        self.policy = policy
+        self.maxsize = 1 if policy == LATEST else max(1, maxsize)
+        self.coalesce = coalesce
+        self.dropped = 0
+        self.closed = False
+        self._items = deque()
+        self._cond = threading.Condition()
+        # Called after every put and on close, e.g. to wake a Merge
+        self._listeners = []
+
+    def put(self, item):
+        with self._cond:
+            if self.policy == BLOCK:
+                self._cond.wait_for(lambda: len(self._items) < self.maxsize or self.closed)
+            if self.closed:
+                return
+            if len(self._items) >= self.maxsize:
+                dropped = self._items.popleft()
+                self.dropped += 1
+                if self.coalesce:
+                    if self._items:
+                        self._items[0] = self.coalesce(dropped, self._items[0])
+                    else:
+                        item = self.coalesce(dropped, item)
+            self._items.append(item)
+            self._cond.notify_all()
+        for listener in self._listeners:
+            listener()
+
+    def get(self, timeout=None):
+        """Next item, or None if none arrived within ``timeout`` seconds.
+
+        Raises StreamClosed once the stream has ended and all items were read.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items or self.closed, timeout):
+                return None
+            if self._items:
+                item = self._items.popleft()
+                # Room for a blocked source
+                self._cond.notify_all()
+                return item
+        raise StreamClosed
+
+    def __len__(self):
+        return len(self._items)
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+        for listener in self._listeners:
+            listener()
+
+
+class Stream:
+    """Run a source's ``read`` on a background thread and fan results out to subscribers.
+
+    ``read()`` returns a Stamped item, None when nothing new arrived (it
+    should wait briefly itself rather than spin), or raises StopIteration
+    when the source has ended. The thread starts with the first
+    subscription, and every subscriber sees the same items, so a game, a
+    recorder and a network publisher share one capture and inference.
+    """
+
+    def __init__(self, read, name='stream', coalesce=None):
+        self.read = read
+        self.name = name
+        self.coalesce = coalesce
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = None
+
+    def subscribe(self, policy=LATEST, maxsize=1):
+        sub = Subscription(policy, maxsize, self.coalesce)
+        with self._lock:
+            self._subscribers.append(sub)
+            if self._thread is None:
+                self._running = True
+                self._thread = threading.Thread(target=self._run, name=f'Stream-{self.name}',
+                                                daemon=True)
+                self._thread.start()
+            elif not self._running:
+                sub.close()
+        return sub
+
+    def _run(self):
+        try:
+            while self._running:
+                try:
+                    item = self.read()
+                except StopIteration:
+                    break
+                if item is None:
+                    continue
+                with self._lock:
+                    subscribers = [sub for sub in self._subscribers if not sub.closed]
+                    self._subscribers = subscribers
+                for sub in subscribers:
+                    sub.put(item)
+        finally:
+            self._close_subscribers()
+
+    def _close_subscribers(self):
+        with self._lock:
+            self._running = False
+            subscribers, self._subscribers = self._subscribers, []
+        for sub in subscribers:
+            sub.close()
+
+    def close(self):
+        self._close_subscribers()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+
+
+class Merge(_Iterable):
+    """Merge subscriptions from several sources into one stream ordered by timestamp.
+
+    An item is released as soon as every open input has something queued
+    (so nothing older can still arrive), or once it is ``latency`` seconds
+    old by ``clock``, which bounds how long a silent source can hold up the
+    others. Results that arrive late, like face metrics that finish
+    inference after newer audio levels, are still put in order provided
+    they come within ``latency``.
+    """
+
+    def __init__(self, *inputs, latency=0.05, clock=time.perf_counter):
+        self.inputs = inputs
+        self.latency = latency
+        self.clock = clock
+        self._heap = []
+        self._order = itertools.count()
+        self._wake = threading.Event()
+        for sub in inputs:
+            sub._listeners.append(self._wake.set)
+
+    def _collect(self):
+        for k, sub in enumerate(self.inputs):
+            while True:
+                try:
+                    item = sub.get(0)
+                except StreamClosed:
+                    break
+                if item is None:
+                    break
+                heapq.heappush(self._heap, (item.timestamp, next(self._order), k, item))
+
+    def get(self, timeout=None):
+        deadline = None if timeout is None else self.clock() + timeout
+        while True:
+            self._wake.clear()
+            self._collect()
+            now = self.clock()
+            wait = None
+            if self._heap:
+                queued = {k for _, _, k, _ in self._heap}
+                idle = [sub for k, sub in enumerate(self.inputs)
+                        if k not in queued and not sub.closed]
+                age = now - self._heap[0][0]
+                if not idle or age >= self.latency:
+                    return heapq.heappop(self._heap)[3]
+                wait = self.latency - age
+            elif all(sub.closed for sub in self.inputs):
+                raise StreamClosed
+            if deadline is not None:
+                if now >= deadline:
+                    return None
+                wait = deadline - now if wait is None else min(wait, deadline - now)
+            self._wake.wait(wait)
+
+    def close(self):
+        for sub in self.inputs:
+            sub.close()
+
+
+def merge(*inputs, latency=0.05):
+    """Timestamp-ordered Merge of ``inputs`` (Subscriptions), e.g. face, hand and voice streams."""
+    return Merge(*inputs, latency=latency)
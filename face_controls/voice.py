@@ -1,38 +1,140 @@
+import threading
+import time
+
 import pyaudio
 import numpy as np
-import pyttsx3
+from face_controls.speech import SpeechWorker
+from face_controls.streams import LATEST, Stamped, Stream
+
+
+def _rms(samples):
+    try:
+        audio_data = samples.astype(np.float32)
+        return float(np.sqrt(np.mean(audio_data ** 2)))
+    except Exception:
+        return 0.0
+
+
+class AudioRingBuffer:
+    """Single-producer ring buffer of int16 samples.
+
+    The writer (PyAudio's callback thread) copies samples in and only then
+    advances ``written``, so readers never take a lock; they just snapshot the
+    most recent samples behind the write position.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.buf = np.zeros(capacity, dtype=np.int16)
+        # Total samples ever written; the write position is written % capacity
+        self.written = 0
+
+    def write(self, samples):
+        samples = samples[-self.capacity:]
+        n = len(samples)
+        start = self.written % self.capacity
+        first = min(n, self.capacity - start)
+        self.buf[start:start + first] = samples[:first]
+        self.buf[:n - first] = samples[first:]
+        self.written += n
+
+    def latest(self, n):
+        """Copy of the last ``n`` samples (fewer if not yet captured)."""
+        end = self.written
+        n = min(n, self.capacity, end)
+        start = (end - n) % self.capacity
+        if start + n <= self.capacity:
+            return self.buf[start:start + n].copy()
+        return np.concatenate((self.buf[start:], self.buf[:start + n - self.capacity]))
+
 
 class VoiceController:
-    def __init__(self, rate=16000, chunk=1024, threshold=500):
+    def __init__(self, rate=16000, chunk=1024, threshold=500, callback=False, buffer_seconds=2.0):
         self.rate = rate
         self.chunk = chunk
         self.threshold = threshold
+        # Callback mode: PyAudio pushes audio from its own thread into a ring
+        # buffer and read() returns the latest RMS without blocking
+        self.callback = callback
+        self.ring = AudioRingBuffer(int(rate * buffer_seconds)) if callback else None
+        self._rms = 0.0
+        # Chunk counter and arrival time of the latest chunk, for stream()
+        self._chunks = 0
+        self._streamed = 0
+        self._chunk_time = 0.0
+        self._chunk_cond = threading.Condition()
+        self._stream = None
         self.p = pyaudio.PyAudio()
-        self.stream = self.p.open(
+        self.input_stream = self.p.open(
             format=pyaudio.paInt16,
             channels=1,
             rate=self.rate,
             input=True,
-            frames_per_buffer=self.chunk
+            frames_per_buffer=self.chunk,
+            stream_callback=self._on_audio if callback else None
         )
-        # Initialize TTS engine
-        self.tts_engine = pyttsx3.init()
+        # TTS runs on a background worker so speaking never blocks the caller
+        self.speech = SpeechWorker()
+
+    def _on_audio(self, in_data, frame_count, time_info, status):
+        samples = np.frombuffer(in_data, dtype=np.int16)
+        self.ring.write(samples)
+        self._rms = _rms(samples)
+        with self._chunk_cond:
+            self._chunks += 1
+            self._chunk_time = time.perf_counter()
+            self._chunk_cond.notify_all()
+        return None, pyaudio.paContinue
 
     def read(self):
-        data = self.stream.read(self.chunk, exception_on_overflow=False)
-        try:
-            audio_data = np.frombuffer(data, dtype=np.int16).astype(np.float32)
-            rms = float(np.sqrt(np.mean(audio_data ** 2)))
-        except Exception:
-            rms = 0.0
-        return rms
+        if self.callback:
+            return self._rms
+        data = self.input_stream.read(self.chunk, exception_on_overflow=False)
+        return _rms(np.frombuffer(data, dtype=np.int16))
+
+    def stream(self, policy=LATEST, maxsize=1):
+        """Subscribe to Stamped('voice') items holding the RMS level of each audio chunk.
+
+        See face_controls.streams for the backpressure policies.
+        """
+        if self._stream is None:
+            self._stream = Stream(self._next_stamped, 'voice')
+        return self._stream.subscribe(policy, maxsize)
+
+    def _next_stamped(self):
+        if not self.callback:
+            amp = self.read()
+            return Stamped(time.perf_counter(), 'voice', amp)
+        with self._chunk_cond:
+            seen = self._streamed
+            if not self._chunk_cond.wait_for(lambda: self._chunks != seen, timeout=0.5):
+                return None
+            self._streamed = self._chunks
+            return Stamped(self._chunk_time, 'voice', self._rms)
+
+    def read_samples(self, ms):
+        """Return the last ``ms`` milliseconds of int16 samples (callback mode only)."""
+        if not self.callback:
+            raise RuntimeError("read_samples() requires VoiceController(callback=True)")
+        return self.ring.latest(int(self.rate * ms / 1000))
 
     def close(self):
-        self.stream.stop_stream()
-        self.stream.close()
+        if self._stream is not None:
+            self._stream.close()
+        self.speech.close()
+        self.input_stream.stop_stream()
+        self.input_stream.close()
         self.p.terminate()
-    
+
+    @property
+    def speaking(self):
+        """True while the TTS engine is speaking a phrase."""
+        return self.speech.speaking
+
     def speak(self, text: str):
-        """Speak the given text using the TTS engine."""
-        self.tts_engine.say(text)
-        self.tts_engine.runAndWait()
\ No newline at end of file
+        """Queue the given text for the TTS engine and return immediately."""
+        self.speech.say(text)
+
+    def stop_speaking(self):
+        """Drop queued phrases and interrupt the current one."""
+        self.speech.cancel()
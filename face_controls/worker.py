@@ -0,0 +1,156 @@
+import multiprocessing
+from multiprocessing import shared_memory
+import time
+
+import cv2
+import numpy as np
+
+from face_controls.metrics import FaceMetricsBatch, PerceptionResult
+from face_controls.recording import fill_record, record_dtype, record_metrics
+
+
+def state_dtype(max_faces=4, max_hands=4):
+    """Shared state published by the worker: a seqlock counter, the ring slot
+    holding the frame and one perception record (see ``record_dtype``)."""
+    return np.dtype([
+        ('seq', '<u8'),       # odd while the worker is writing
+        ('consumed', '<u8'),  # last seq read by the game process
+        ('slot', '<i4'),      # ring slot of the frame, -1 before the first one
+        ('record', record_dtype(max_faces, max_hands)),
+    ])
+
+
+def _run_worker(frames_name, state_name, shape, max_faces, max_hands, face_kwargs,
+                draw_overlay, stop):
+    # Imported here so that importing this module does not load MediaPipe;
+    # only the worker process needs it
+    from face_controls.face import FaceController
+    from face_controls.hands import HandTracker
+    from face_controls.pipeline import PerceptionPipeline
+
+    frames_shm = shared_memory.SharedMemory(name=frames_name)
+    state_shm = shared_memory.SharedMemory(name=state_name)
+    frames = np.ndarray(shape, np.uint8, buffer=frames_shm.buf)
+    state = np.ndarray((), state_dtype(max_faces, max_hands), buffer=state_shm.buf)
+    rec = state['record']
+    face = FaceController(threaded=True, lazy_overlay=True, **face_kwargs)
+    pipeline = PerceptionPipeline(face, HandTracker(max_num_hands=max_hands), concurrent=True)
+    size = (shape[2], shape[1])
+    slot = -1
+    try:
+        while not stop.is_set():
+            result = pipeline.read(wait=True)
+            if result.frame is None:
+                # Capture failed or ended; avoid spinning
+                time.sleep(0.01)
+                continue
+            if draw_overlay:
+                # Landmarks are in camera pixels: draw before any resize
+                face.draw_overlay(result.frame)
+            slot = (slot + 1) % shape[0]
+            dst = frames[slot]
+            if result.frame.shape == dst.shape:
+                np.copyto(dst, result.frame)
+            else:
+                cv2.resize(result.frame, size, dst=dst)
+            seq = int(state['seq'])
+            if seq and int(state['consumed']) != seq:
+                # The previous result was never read: keep its blinks
+                n = min(len(result.metrics), int(rec['n_faces']))
+                result.metrics.blink[:n] |= rec['faces']['blink'][:n].astype(bool)
+            state['seq'] = seq + 1
+            fill_record(rec, result.timestamp, result.metrics, result.hands)
+            state['slot'] = slot
+            state['seq'] = seq + 2
+    finally:
+        del frames, state, rec
+        pipeline.release()
+        frames_shm.close()
+        state_shm.close()
+
+
+class PerceptionProcess:
+    """Run face and hand perception in a separate process, sharing results via shared memory.
+
+    The worker process owns the camera, FaceMesh and Hands, so inference
+    runs in parallel with the game instead of contending for its GIL. Each
+    frame is copied once into a ring of ``slots`` preallocated frames of
+    ``frame_size`` (resized if the camera differs) and the metrics are
+    published into a small shared struct guarded by a sequence counter.
+
+    ``read()`` has the PerceptionThread contract: it never blocks, returns
+    the newest result or repeats the previous one with blinks cleared, and
+    blinks from results overwritten before being read are carried forward.
+    The returned frame is a view into the ring, not a copy; it stays valid
+    until the worker has published ``slots - 1`` more frames. With
+    ``draw_overlay=True`` the worker draws the face mesh into the frame.
+    Extra keyword arguments configure the worker's FaceController.
+    """
+
+    def __init__(self, frame_size=(640, 480), slots=3, max_faces=4, max_hands=4,
+                 draw_overlay=False, **face_kwargs):
+        w, h = frame_size
+        shape = (slots, h, w, 3)
+        dtype = state_dtype(max_faces, max_hands)
+        self._frames_shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)))
+        self._state_shm = shared_memory.SharedMemory(create=True, size=dtype.itemsize)
+        self._frames = np.ndarray(shape, np.uint8, buffer=self._frames_shm.buf)
+        self._state = np.ndarray((), dtype, buffer=self._state_shm.buf)
+        self._state['slot'] = -1
+        self._taken = 0
+        self._result = PerceptionResult(FaceMetricsBatch(), [], None, 0.0)
+        # A fresh interpreter: forking a process with camera and audio
+        # threads running is not safe
+        ctx = multiprocessing.get_context('spawn')
+        self._stop = ctx.Event()
+        self._process = ctx.Process(
+            target=_run_worker, name='PerceptionProcess', daemon=True,
+            args=(self._frames_shm.name, self._state_shm.name, shape, max_faces, max_hands,
+                  face_kwargs, draw_overlay, self._stop))
+        self._process.start()
+
+    @property
+    def alive(self):
+        return self._process.is_alive()
+
+    def _snapshot(self):
+        """(seq, record copy, slot) read consistently, or None if the worker kept writing."""
+        state = self._state
+        for _ in range(100):
+            seq = int(state['seq'])
+            if seq & 1:
+                continue
+            rec = state['record'].copy()
+            slot = int(state['slot'])
+            if int(state['seq']) == seq:
+                return seq, rec, slot
+        return None
+
+    def read(self):
+        snapshot = self._snapshot()
+        if snapshot is None or snapshot[0] == self._taken:
+            result = self._result
+            return result._replace(metrics=result.metrics.without_blinks())
+        seq, rec, slot = snapshot
+        self._taken = seq
+        self._state['consumed'] = seq
+        metrics_list, hands = record_metrics(rec)
+        frame = self._frames[slot] if slot >= 0 else None
+        self._result = PerceptionResult(metrics_list, hands, frame, float(rec['timestamp']))
+        return self._result
+
+    def release(self):
+        self._stop.set()
+        self._process.join(timeout=2.0)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join()
+        self._frames = self._state = None
+        self._result = PerceptionResult(FaceMetricsBatch(), [], None, 0.0)
+        for shm in (self._frames_shm, self._state_shm):
+            try:
+                shm.close()
+            except BufferError:
+                # A frame view is still referenced; the mapping goes with it
+                pass
+            shm.unlink()
@@ -0,0 +1,5 @@
+"""Game Simulation Module.
+
+Provides the entity storage and simulation subsystems used by the
+face-controlled avatar game.
+"""
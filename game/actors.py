@@ -0,0 +1,495 @@
+import math
+import random
+
+import numpy as np
+
+from face_controls.metrics import as_batch
+from game.entities import MOVE_CHASE, MOVE_OSCILLATE, MOVE_STRAIGHT, MOVE_WIGGLE, Pooled
+
+# --- Game entity classes ---
+# Creatures and projectiles are pooled: spawn them with Cls.acquire(...) and
+# EntityStore.append() recycles them once their state is copied
+class Creature(Pooled):
+    __slots__ = ('x', 'y', 'radius', 'speed', 'alive', 'color')
+    # Update kernel used when stored in an EntityStore
+    motion = MOVE_CHASE
+    def __init__(self, cx, cy, screen_w, screen_h, rng=random):
+        self.radius = 15
+        edge = rng.choice(['top','bottom','left','right'])
+        if edge == 'top':
+            self.x = rng.uniform(0, screen_w)
+            self.y = -self.radius
+        elif edge == 'bottom':
+            self.x = rng.uniform(0, screen_w)
+            self.y = screen_h + self.radius
+        elif edge == 'left':
+            self.x = -self.radius
+            self.y = rng.uniform(0, screen_h)
+        else:
+            self.x = screen_w + self.radius
+            self.y = rng.uniform(0, screen_h)
+        self.speed = rng.uniform(50, 120)
+        self.alive = True
+    def update(self, dt, cx, cy):
+        dx = cx - self.x
+        dy = cy - self.y
+        dist = math.hypot(dx, dy) or 1e-6
+        self.x += (dx/dist) * self.speed * dt
+        self.y += (dy/dist) * self.speed * dt
+
+class Laser(Pooled):
+    __slots__ = ('x', 'y', 'vx', 'vy', 'radius', 'active', 'color')
+    motion = MOVE_STRAIGHT
+    def __init__(self, x, y, vx, vy):
+        self.x = x; self.y = y
+        self.vx = vx; self.vy = vy
+        self.radius = 5
+        self.active = True
+    def update(self, dt):
+        self.x += self.vx * dt
+        self.y += self.vy * dt
+        if not (0 <= self.x <= 640 and 0 <= self.y <= 480):
+            self.active = False
+
+class BaseBoss:
+    def __init__(self, cx, cy, world=None):
+        # World whose entity stores boss abilities spawn into, and its RNG
+        self.world = world
+        self.rng = world.rng if world is not None else random
+        # Base boss positioned above the avatar center
+        self.x = cx; self.y = cy - 150
+        self.radius = 40
+        self.health = 20
+        self.speed = 60
+        self.angle = 0.0
+    def update(self, dt, cx, cy):
+        self.angle += dt
+        self.x = cx + math.cos(self.angle) * 150
+        self.y = cy + math.sin(self.angle) * 80
+   
+# --- New enemy and boss subclasses ---
+class Fireball(Laser):
+    __slots__ = ()
+    def __init__(self, x, y, vx, vy):
+        super().__init__(x, y, vx, vy)
+        self.radius = 8
+        self.color = (255, 50, 0)
+
+class PurpleLaser(Laser):
+    __slots__ = ()
+    def __init__(self, x, y, vx, vy):
+        super().__init__(x, y, vx, vy)
+        self.color = (200, 0, 200)
+        self.radius = 6
+
+class Snowie(Creature):
+    __slots__ = ()
+    def __init__(self, cx, cy, screen_w, screen_h, rng=random):
+        super().__init__(cx, cy, screen_w, screen_h, rng)
+        self.speed = 40
+        self.color = (200, 200, 255)
+
+class FireSpinner(Creature):
+    __slots__ = ()
+    def __init__(self, cx, cy, screen_w, screen_h, rng=random):
+        super().__init__(cx, cy, screen_w, screen_h, rng)
+        self.speed = 80
+        self.color = (255, 100, 0)
+
+class Ghost(Creature):
+    __slots__ = ()
+    def __init__(self, cx, cy, screen_w, screen_h, rng=random):
+        super().__init__(cx, cy, screen_w, screen_h, rng)
+        self.speed = 100
+        self.color = (180, 180, 255)
+
+class Ghast(Creature):
+    __slots__ = ()
+    def __init__(self, cx, cy, screen_w, screen_h, rng=random):
+        super().__init__(cx, cy, screen_w, screen_h, rng)
+        self.radius = 30
+        self.speed = 30
+        self.color = (255, 255, 255)
+
+class Skeleton(Creature):
+    __slots__ = ()
+    def __init__(self, cx, cy, screen_w, screen_h, rng=random):
+        super().__init__(cx, cy, screen_w, screen_h, rng)
+        self.speed = 70
+        self.color = (160, 160, 160)
+
+class Dragon(Creature):
+    __slots__ = ('osc_angle',)
+    motion = MOVE_OSCILLATE
+    def __init__(self, cx, cy, screen_w, screen_h, rng=random):
+        super().__init__(cx, cy, screen_w, screen_h, rng)
+        self.radius = 25
+        self.speed = 120
+        self.color = (255, 0, 255)
+        self.osc_angle = 0.0
+    def update(self, dt, cx, cy):
+        self.osc_angle += dt * 5
+        offset = math.sin(self.osc_angle) * 50
+        dx = (cx + offset) - self.x
+        dy = cy - self.y
+        dist = math.hypot(dx, dy) or 1e-6
+        self.x += (dx/dist) * self.speed * dt
+        self.y += (dy/dist) * self.speed * dt
+
+class Caster(Creature):
+    __slots__ = ()
+    def __init__(self, cx, cy, screen_w, screen_h, rng=random):
+        super().__init__(cx, cy, screen_w, screen_h, rng)
+        self.speed = 60
+        self.color = (0, 255, 255)
+
+class SnowKing(BaseBoss):
+    def __init__(self, cx, cy, world=None):
+        super().__init__(cx, cy, world)
+        self.health = 30
+        self.spawn_interval = 3.0
+        self.spawn_timer = 0.0
+        self.color = (200, 200, 255)
+
+class FlameWarden(BaseBoss):
+    def __init__(self, cx, cy, world=None):
+        super().__init__(cx, cy, world)
+        self.health = 25
+        self.spawn_interval = 2.0
+        self.spawn_timer = 0.0
+        self.color = (255, 100, 0)
+
+class MadackedaBoss(BaseBoss):
+    def __init__(self, cx, cy, world=None):
+        super().__init__(cx, cy, world)
+        self.health = 50
+        self.spawn_interval = 1.5
+        self.spawn_timer = 0.0
+        # Teleport and shield
+        self.teleport_interval = 5.0
+        self.teleport_timer = 0.0
+        self.shield_interval = 4.0
+        self.shield_timer = 0.0
+        self.shield_active = False
+        self.shield_duration_default = 2.0
+        self.shield_duration = 0.0
+        self.color = (128, 0, 128)
+        # Purple laser attack
+        self.laser_interval = 3.0
+        self.laser_timer = 0.0
+
+# --- Additional Boss Classes ---
+class VortexBoss(BaseBoss):
+    def __init__(self, cx, cy, world=None):
+        super().__init__(cx, cy, world)
+        self.health = 35
+        self.color = (100, 100, 255)
+        self.pull_radius = 200
+        self.pull_strength = 100
+        self.pulse_interval = 3.0
+        self.pulse_timer = 0.0
+    def update(self, dt, cx, cy):
+        super().update(dt, cx, cy)
+        self.pulse_timer += dt
+        if self.pulse_timer >= self.pulse_interval:
+            # Pull every creature within range towards the vortex
+            creatures = self.world.creatures
+            dx = self.x - creatures.x; dy = self.y - creatures.y
+            dist = np.hypot(dx, dy)
+            dist[dist == 0] = 1e-6
+            near = dist < self.pull_radius
+            step = self.pull_strength * dt / dist[near]
+            creatures.x[near] += dx[near] * step
+            creatures.y[near] += dy[near] * step
+            self.pulse_timer = 0.0
+
+class SpinnerBoss(BaseBoss):
+    def __init__(self, cx, cy, world=None):
+        super().__init__(cx, cy, world)
+        self.health = 30
+        self.color = (255, 200, 0)
+        self.spin_speed = 6.0
+        self.projectile_interval = 2.5
+        self.projectile_timer = 0.0
+    def update(self, dt, cx, cy):
+        self.angle += self.spin_speed * dt
+        self.x = cx; self.y = cy - 150
+        self.projectile_timer += dt
+        if self.projectile_timer >= self.projectile_interval:
+            for a in range(0, 360, 45):
+                rad = math.radians(a)
+                vx = math.cos(rad)*300; vy = math.sin(rad)*300
+                self.world.lasers.append(PurpleLaser.acquire(self.x, self.y, vx, vy))
+            self.projectile_timer = 0.0
+
+class RamBoss(BaseBoss):
+    def __init__(self, cx, cy, world=None):
+        super().__init__(cx, cy, world)
+        self.health = 40
+        self.color = (200, 100, 50)
+        self.charge_speed = 400
+        self.charge_interval = 4.0
+        self.charge_timer = 0.0
+        self.charging = False
+        self.charge_duration = 0.5
+        self.charge_time = 0.0
+    def update(self, dt, cx, cy):
+        if not self.charging:
+            self.charge_timer += dt
+            if self.charge_timer >= self.charge_interval:
+                self.charging = True
+                self.charge_time = 0.0
+                self.charge_timer = 0.0
+                # Charge at the current target position
+                dx = cx-self.x; dy = cy-self.y; dist=math.hypot(dx,dy) or 1e-6
+                self.vx = dx/dist*self.charge_speed; self.vy = dy/dist*self.charge_speed
+        else:
+            self.charge_time += dt
+            self.x += self.vx*dt; self.y += self.vy*dt
+            if self.charge_time >= self.charge_duration:
+                self.charging = False
+        if not self.charging:
+            super().update(dt, cx, cy)
+
+class TrackerBoss(BaseBoss):
+    def __init__(self, cx, cy, world=None):
+        super().__init__(cx, cy, world)
+        self.health = 30
+        self.color = (0, 255, 100)
+        self.track_interval = 3.0
+        self.track_timer = 0.0
+    def update(self, dt, cx, cy):
+        super().update(dt, cx, cy)
+        self.track_timer += dt
+        if self.track_timer >= self.track_interval:
+            # Track current target
+            dx = cx-self.x; dy = cy-self.y; dist=math.hypot(dx,dy) or 1e-6
+            vx = dx/dist*200; vy = dy/dist*200
+            self.world.lasers.append(PurpleLaser.acquire(self.x, self.y, vx, vy))
+            self.track_timer = 0.0
+
+class ArticalBoss(BaseBoss):
+    def __init__(self, cx, cy, world=None):
+        super().__init__(cx, cy, world)
+        self.health = 35
+        self.color = (100, 200, 200)
+        self.teleport_interval = 4.0
+        self.teleport_timer = 0.0
+    def update(self, dt, cx, cy):
+        super().update(dt, cx, cy)
+        self.teleport_timer += dt
+        if self.teleport_timer >= self.teleport_interval:
+            # Teleport to random position near target
+            angle = self.rng.uniform(0, 2*math.pi)
+            dist = self.rng.uniform(100, 200)
+            self.x = cx + math.cos(angle) * dist
+            self.y = cy + math.sin(angle) * dist
+            self.teleport_timer = 0.0
+
+class ShadowBoss(BaseBoss):
+    def __init__(self, cx, cy, world=None):
+        super().__init__(cx, cy, world)
+        self.health = 40
+        self.color = (50, 50, 50)
+        self.clone_interval = 5.0
+        self.clone_timer = 0.0
+        self.clones = []
+    def update(self, dt, cx, cy):
+        super().update(dt, cx, cy)
+        self.clone_timer += dt
+        if self.clone_timer >= self.clone_interval:
+            rng = self.rng
+            edge = rng.choice(['top','bottom','left','right'])
+            sw, sh = self.world.size
+            if edge=='top': px, py = rng.uniform(0, sw), 0
+            elif edge=='bottom': px, py = rng.uniform(0, sw), sh
+            elif edge=='left': px, py = 0, rng.uniform(0, sh)
+            else: px, py = sw, rng.uniform(0, sh)
+            self.world.creatures.append(Creature.acquire(px, py, sw, sh, rng))
+            self.clone_timer = 0.0
+
+class AlienKingBoss(BaseBoss):
+    def __init__(self, cx, cy, world=None):
+        super().__init__(cx, cy, world)
+        self.health = 60
+        self.color = (150, 0, 200)
+        self.ability_interval = 4.0
+        self.ability_timer = 0.0
+    def update(self, dt, cx, cy):
+        super().update(dt, cx, cy)
+        self.ability_timer += dt
+        if self.ability_timer >= self.ability_interval:
+            for a in range(0, 360, 30):
+                rad = math.radians(a + self.rng.uniform(-15,15))
+                self.world.lasers.append(PurpleLaser.acquire(self.x, self.y, math.cos(rad)*350, math.sin(rad)*350))
+            self.ability_timer = 0.0
+
+# Snake projectile for XYZ
+class Snake(Laser):
+    __slots__ = ('wiggle_angle',)
+    motion = MOVE_WIGGLE
+    def __init__(self, x, y, target_x, target_y):
+        dx = target_x - x
+        dy = target_y - y
+        dist = math.hypot(dx, dy) or 1e-6
+        super().__init__(x, y, dx/dist * 250, dy/dist * 250)
+        self.radius = 10
+        self.color = (50, 200, 50)
+        self.wiggle_angle = 0.0
+    def update(self, dt):
+        self.wiggle_angle += dt * 10
+        offset = math.sin(self.wiggle_angle) * 30
+        perp_x = -self.vy / math.hypot(self.vx, self.vy)
+        perp_y = self.vx / math.hypot(self.vx, self.vy)
+        self.x += self.vx * dt + perp_x * offset * dt
+        self.y += self.vy * dt + perp_y * offset * dt
+        if not (0 <= self.x <= 640 and 0 <= self.y <= 480):
+            self.active = False
+
+# XYZ creature (honsil) that Gary rides
+class XYZ(BaseBoss):
+    def __init__(self, cx, cy, world=None):
+        super().__init__(cx, cy, world)
+        self.radius = 60
+        self.health = 100
+        self.color = (100, 50, 150)
+        self.snake_interval = 2.0
+        self.snake_timer = 0.0
+        self.dash_interval = 5.0
+        self.dash_timer = 0.0
+        self.dashing = False
+        self.dash_duration = 0.8
+        self.dash_time = 0.0
+        self.dash_vx = 0
+        self.dash_vy = 0
+    def update(self, dt, cx, cy):
+        if not self.dashing:
+            super().update(dt, cx, cy)
+            self.dash_timer += dt
+            if self.dash_timer >= self.dash_interval:
+                self.dashing = True
+                self.dash_time = 0.0
+                self.dash_timer = 0.0
+                dx = cx - self.x
+                dy = cy - self.y
+                dist = math.hypot(dx, dy) or 1e-6
+                self.dash_vx = dx/dist * 500
+                self.dash_vy = dy/dist * 500
+        else:
+            self.dash_time += dt
+            self.x += self.dash_vx * dt
+            self.y += self.dash_vy * dt
+            if self.dash_time >= self.dash_duration:
+                self.dashing = False
+        # Snake attacks
+        self.snake_timer += dt
+        if self.snake_timer >= self.snake_interval:
+            self.world.snakes.append(Snake.acquire(self.x, self.y, cx, cy))
+            self.snake_timer = 0.0
+
+# Gary boss with eye-contact mechanic
+class GaryBoss(BaseBoss):
+    def __init__(self, cx, cy, is_shadow=False, world=None):
+        super().__init__(cx, cy, world)
+        self.is_shadow = is_shadow
+        self.radius = 45
+        self.health = 80 if is_shadow else 60
+        self.color = (50, 0, 50) if is_shadow else (255, 105, 180)
+        self.riding_xyz = None
+        self.attack_interval = 1.5
+        self.attack_timer = 0.0
+        self.being_looked_at = False
+        self.anger_level = 0.0
+        self.provoked = False
+        self.teleport_interval = 4.0 if is_shadow else 6.0
+        self.teleport_timer = 0.0
+        # Crystal throw attack
+        self.crystal_interval = 2.5
+        self.crystal_timer = 0.0
+        # Global update flag
+        self.ignores_pause = True
+    def check_eye_contact(self, metrics_list, centers):
+        metrics_list = as_batch(metrics_list)
+        n = min(len(metrics_list), len(centers))
+        # Gaze direction of every player against the direction to Gary
+        c = np.asarray(centers[:n], dtype=float).reshape(n, 2)
+        dx = self.x - c[:, 0]
+        dy = self.y - c[:, 1]
+        dist = np.hypot(dx, dy)
+        gaze_x = np.sin(metrics_list.yaw[:n])
+        gaze_y = -np.sin(metrics_list.pitch[:n])
+        dot = (dx * gaze_x + dy * gaze_y) / np.where(dist > 0, dist, 1e-6)
+        # Close enough to make eye contact and looking roughly at Gary
+        self.being_looked_at = bool(np.any((dist < 300) & (dot > 0.7)))
+        if self.being_looked_at and not self.provoked:
+            self.anger_level = min(self.anger_level + 0.02, 1.0)
+            if self.anger_level >= 1.0:
+                self.provoked = True
+    def update(self, dt, cx, cy, metrics_list=None, centers=None):
+        # Always update even during pause
+        if self.riding_xyz and self.riding_xyz.health > 0:
+            # Ride on top of XYZ
+            self.x = self.riding_xyz.x
+            self.y = self.riding_xyz.y - 50
+        else:
+            super().update(dt, cx, cy)
+        # Check eye contact
+        if metrics_list and centers:
+            self.check_eye_contact(metrics_list, centers)
+        # Attacks only if not being looked at (or if provoked)
+        if not self.being_looked_at or self.provoked:
+            self.attack_timer += dt
+            if self.attack_timer >= self.attack_interval:
+                # Melee or crystal throw
+                if math.hypot(self.x - cx, self.y - cy) < 150:
+                    # Close range melee - damage handled elsewhere
+                    pass
+                else:
+                    # Throw crystal
+                    dx = cx - self.x
+                    dy = cy - self.y
+                    dist = math.hypot(dx, dy) or 1e-6
+                    vx = dx/dist * 300
+                    vy = dy/dist * 300
+                    crystal = PurpleLaser.acquire(self.x, self.y, vx, vy)
+                    crystal.color = (255, 0, 255) if self.is_shadow else (255, 192, 203)
+                    self.world.lasers.append(crystal)
+                self.attack_timer = 0.0
+        # Teleportation
+        self.teleport_timer += dt
+        if self.teleport_timer >= self.teleport_interval:
+            if self.is_shadow:
+                # Shadow Gary teleports to dark corners
+                corners = [(50, 50), (590, 50), (50, 430), (590, 430)]
+                self.x, self.y = self.rng.choice(corners)
+            else:
+                # Normal Gary random teleport
+                self.x = self.rng.randint(50, 590)
+                self.y = self.rng.randint(50, 430)
+            self.teleport_timer = 0.0
+
+# Elder Dimension Portal
+class ElderPortal:
+    def __init__(self, x, y, world):
+        self.world = world
+        self.x = x
+        self.y = y
+        self.radius = 40
+        self.active = True
+        self.pulse = 0.0
+        self.spawn_timer = 0.0
+        self.gary_spawned = False
+    def update(self, dt):
+        self.pulse += dt * 2
+        self.spawn_timer += dt
+        if self.spawn_timer >= 5.0 and not self.gary_spawned:
+            # Spawn Gary from portal
+            world = self.world
+            is_shadow = world.rng.random() < 0.01  # 1% chance for Shadow Gary
+            world.gary_boss = GaryBoss(self.x, self.y, is_shadow, world)
+            # Also spawn XYZ for Gary to ride
+            xyz = XYZ(self.x, self.y + 100, world)
+            world.gary_boss.riding_xyz = xyz
+            world.creatures.append(xyz)
+            self.gary_spawned = True
+            world.elder_dimension_active = True
@@ -0,0 +1,137 @@
+"""Allocation and GC benchmark for the headless game simulation.
+
+Runs scripted boss phases (two players blinking, four hands firing every
+tick against ring-emitting bosses) with entity pooling on and off, and
+reports tick latency, garbage collections and their pauses, and allocated
+memory::
+
+    python -m game.benchmark
+    python -m game.benchmark --ticks 5000 --tracemalloc
+"""
+import argparse
+import gc
+import math
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from face_controls.metrics import FaceMetricsBatch
+from game.actors import AlienKingBoss, SpinnerBoss, TrackerBoss
+from game.entities import Pooled
+from game.world import GameWorld
+
+# Bosses that keep the projectile stores busy, and their game states
+PHASES = [
+    (SpinnerBoss, 'boss_spinner'),
+    (AlienKingBoss, 'boss_alienking'),
+    (TrackerBoss, 'boss_tracker'),
+]
+
+
+class GcMonitor:
+    """Count collections per generation and time their pauses via gc.callbacks."""
+
+    def __init__(self):
+        self.pauses = []
+        self.collections = [0, 0, 0]
+        self._start = None
+
+    def _callback(self, phase, info):
+        if phase == 'start':
+            self._start = time.perf_counter()
+        elif self._start is not None:
+            self.pauses.append(time.perf_counter() - self._start)
+            self.collections[info['generation']] += 1
+
+    def __enter__(self):
+        gc.callbacks.append(self._callback)
+        return self
+
+    def __exit__(self, *exc):
+        gc.callbacks.remove(self._callback)
+
+
+def script_inputs(t):
+    """Scripted perception for tick ``t``: two faces and four firing hands."""
+    metrics_list = FaceMetricsBatch.from_metrics([
+        {'yaw': math.sin(t / 20 + i) * 0.5, 'pitch': math.cos(t / 30) * 0.3,
+         'mouth_open_ratio': 0.0, 'blink': t % 7 == i}
+        for i in range(2)])
+    hands = [(80, 80), (560, 80), (80, 400), (560, 400)]
+    return metrics_list, hands
+
+
+def run(ticks=3000, pooling=True, seed=0, trace_memory=False):
+    """Simulate ``ticks`` steps split over the boss phases; return a result dict."""
+    Pooled.pooling = pooling
+    world = GameWorld(seed=seed)
+    dt = 1 / 60
+    durations = []
+    if trace_memory:
+        tracemalloc.start()
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    try:
+        with GcMonitor() as monitor:
+            start = time.perf_counter()
+            for t in range(ticks):
+                phase = t * len(PHASES) // ticks
+                boss_cls, state = PHASES[phase]
+                if not isinstance(world.boss, boss_cls):
+                    world.boss = boss_cls(320, 240, world)
+                    # Keep the boss alive for the whole phase
+                    world.boss.health = 10 ** 9
+                    world.state = state
+                metrics_list, hands = script_inputs(t)
+                t0 = time.perf_counter()
+                world.step(dt, metrics_list, hands)
+                durations.append(time.perf_counter() - t0)
+            elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+        Pooled.pooling = True
+    ms = np.array(durations) * 1000.0
+    pauses = np.array(monitor.pauses or [0.0]) * 1000.0
+    return {
+        'pooling': pooling,
+        'ticks': ticks,
+        'ticks_per_sec': ticks / elapsed,
+        'tick_ms': {'p50': float(np.percentile(ms, 50)), 'p99': float(np.percentile(ms, 99)),
+                    'max': float(ms.max())},
+        'gc_collections': monitor.collections,
+        'gc_pause_ms': {'total': float(pauses.sum()), 'max': float(pauses.max())},
+        'live_blocks_delta': sys.getallocatedblocks() - blocks_before,
+        'peak_traced_kb': peak / 1024 if peak is not None else None,
+        'projectiles': len(world.lasers) + len(world.snakes),
+    }
+
+
+def format_result(r):
+    line = (f"pooling={'on ' if r['pooling'] else 'off'} {r['ticks_per_sec']:8.0f} ticks/s  "
+            f"tick p50 {r['tick_ms']['p50']:.3f} p99 {r['tick_ms']['p99']:.3f} "
+            f"max {r['tick_ms']['max']:.3f} ms  "
+            f"gc {'/'.join(map(str, r['gc_collections']))} "
+            f"pause total {r['gc_pause_ms']['total']:.2f} max {r['gc_pause_ms']['max']:.2f} ms")
+    if r['peak_traced_kb'] is not None:
+        line += f"  peak {r['peak_traced_kb']:.0f} KiB"
+    return line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ticks', type=int, default=3000, help="simulation steps per run")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help="also measure peak allocated memory (slower)")
+    args = parser.parse_args(argv)
+    for pooling in (False, True):
+        print(format_result(run(args.ticks, pooling, args.seed, args.tracemalloc)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
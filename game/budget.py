@@ -0,0 +1,69 @@
+import numpy as np
+
+
+class ProjectileBudget:
+    """Rate limits and a population cap for projectiles.
+
+    Hand fire is limited per hand: wrist positions are matched to the
+    nearest hand tracked on earlier ticks (within ``match_radius`` pixels)
+    and each hand may fire once every ``hand_cooldown`` seconds. Hands
+    unseen for ``forget_after`` seconds are dropped. ``enforce()`` caps the
+    projectiles across the given stores at ``max_projectiles``, evicting
+    the oldest first, so collision work stays bounded however much is
+    fired. ``counters`` keeps running totals for instrumentation.
+    """
+
+    def __init__(self, max_projectiles=256, hand_cooldown=0.25, match_radius=80,
+                 forget_after=1.0):
+        self.max_projectiles = max_projectiles
+        self.hand_cooldown = hand_cooldown
+        self.match_radius = match_radius
+        self.forget_after = forget_after
+        # Tracked hands as [x, y, ready_at, last_seen]
+        self.hands = []
+        self.counters = {'hand_fired': 0, 'hand_suppressed': 0, 'evicted': 0}
+
+    def allow_hands(self, hand_positions, now):
+        """The wrist positions in ``hand_positions`` whose hand may fire at ``now``."""
+        self.hands = [h for h in self.hands if now - h[3] <= self.forget_after]
+        free = list(self.hands)
+        allowed = []
+        r2 = self.match_radius ** 2
+        for x, y in hand_positions:
+            best, best_d2 = None, r2
+            for hand in free:
+                d2 = (hand[0] - x) ** 2 + (hand[1] - y) ** 2
+                if d2 <= best_d2:
+                    best, best_d2 = hand, d2
+            if best is None:
+                best = [x, y, now, now]
+                self.hands.append(best)
+            else:
+                # Each tracked hand matches at most one wrist per tick
+                free.remove(best)
+            best[0], best[1], best[3] = x, y, now
+            if now < best[2]:
+                self.counters['hand_suppressed'] += 1
+                continue
+            best[2] = now + self.hand_cooldown
+            self.counters['hand_fired'] += 1
+            allowed.append((x, y))
+        return allowed
+
+    def enforce(self, *stores):
+        """Kill the oldest projectiles across ``stores`` beyond the cap; return how many."""
+        excess = sum(len(store) for store in stores) - self.max_projectiles
+        if excess <= 0:
+            return 0
+        born = np.concatenate([store.born for store in stores])
+        oldest = np.argsort(born, kind='stable')[:excess]
+        offset = 0
+        for store in stores:
+            n = len(store)
+            idx = oldest[(oldest >= offset) & (oldest < offset + n)] - offset
+            if len(idx):
+                store.alive[idx] = False
+                store.compact()
+            offset += n
+        self.counters['evicted'] += excess
+        return excess
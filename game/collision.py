@@ -0,0 +1,81 @@
+import math
+
+import numpy as np
+
+# Multiplier folding a 2D cell coordinate into one integer key; cell rows
+# must stay within +-KEY_STRIDE / 2
+KEY_STRIDE = 1 << 20
+
+
+class SpatialHash:
+    """Uniform-grid broad phase for circle-vs-circle queries.
+
+    ``build()`` buckets a set of circles by the grid cell of their centre
+    (a sort, fully vectorised); ``query()`` returns every (query, item) pair
+    whose circles overlap, looking only at the cells within reach of each
+    query circle. Rebuilding every tick is cheap, so callers simply rebuild
+    after entities move.
+    """
+
+    def __init__(self, cell_size=64):
+        self.cell_size = float(cell_size)
+        self.x = self.y = self.r = np.empty(0)
+        self._keys = np.empty(0, dtype=np.int64)
+        self._order = np.empty(0, dtype=np.int64)
+        self.max_radius = 0.0
+
+    def __len__(self):
+        return len(self.x)
+
+    def _cells(self, v):
+        return np.floor(v / self.cell_size).astype(np.int64)
+
+    def build(self, x, y, r):
+        """Index circles at (x, y) with radii r."""
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.r = np.broadcast_to(np.asarray(r, dtype=np.float64), self.x.shape)
+        keys = self._cells(self.x) * KEY_STRIDE + self._cells(self.y)
+        self._order = np.argsort(keys, kind='stable')
+        self._keys = keys[self._order]
+        self.max_radius = float(self.r.max()) if len(self.r) else 0.0
+        return self
+
+    def query(self, x, y, r, include_radius=True):
+        """Return (query_idx, item_idx) arrays of overlapping pairs.
+
+        A pair overlaps when the centre distance is below ``r + item radius``
+        (or just ``r`` with ``include_radius=False``). Pairs are sorted by
+        query index, then item index, so callers can resolve them in the same
+        order a nested loop would.
+        """
+        x = np.atleast_1d(np.asarray(x, dtype=np.float64))
+        y = np.atleast_1d(np.asarray(y, dtype=np.float64))
+        r = np.broadcast_to(np.asarray(r, dtype=np.float64), x.shape)
+        empty = np.empty(0, dtype=np.int64)
+        if not len(x) or not len(self.x):
+            return empty, empty
+        # Cells within reach of the widest query + item radius
+        reach = float(r.max()) + (self.max_radius if include_radius else 0.0)
+        k = max(1, int(math.ceil(reach / self.cell_size)))
+        offsets = np.arange(-k, k + 1)
+        cx, cy = self._cells(x), self._cells(y)
+        qkeys = ((cx[:, None, None] + offsets[None, :, None]) * KEY_STRIDE
+                 + (cy[:, None, None] + offsets[None, None, :])).reshape(len(x), -1)
+        starts = np.searchsorted(self._keys, qkeys, side='left').ravel()
+        ends = np.searchsorted(self._keys, qkeys, side='right').ravel()
+        counts = ends - starts
+        total = int(counts.sum())
+        if not total:
+            return empty, empty
+        # Expand each (query, cell) bucket range into candidate pairs
+        qi = np.repeat(np.repeat(np.arange(len(x)), qkeys.shape[1]), counts)
+        run_starts = np.repeat(starts, counts)
+        within = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        ii = self._order[run_starts + within]
+        # Narrow phase: exact circle overlap
+        limit = r[qi] + self.r[ii] if include_radius else r[qi]
+        hit = np.hypot(x[qi] - self.x[ii], y[qi] - self.y[ii]) < limit
+        qi, ii = qi[hit], ii[hit]
+        order = np.lexsort((ii, qi))
+        return qi[order], ii[order]
@@ -0,0 +1,258 @@
+import numpy as np
+
+# Motion kernels an entity can be updated with
+MOVE_STRAIGHT = 0   # constant velocity (lasers, fireballs, purple lasers)
+MOVE_CHASE = 1      # home in on a target at constant speed (creatures)
+MOVE_OSCILLATE = 2  # chase with a sinusoidal sideways offset (Dragon)
+MOVE_WIGGLE = 3     # constant velocity plus perpendicular wiggle (Snake)
+MOVE_CUSTOM = 4     # object with its own update(dt, tx, ty), e.g. XYZ
+
+# Per-entity columns and their dtypes
+FIELDS = (
+    ('x', np.float64),
+    ('y', np.float64),
+    ('px', np.float64),  # position before the last simulation step
+    ('py', np.float64),
+    ('vx', np.float64),
+    ('vy', np.float64),
+    ('radius', np.int32),
+    ('speed', np.float64),
+    ('phase', np.float64),
+    ('born', np.float64),  # simulation time the entity was added
+    ('motion', np.int8),
+    ('kind', np.int16),
+    ('obj', np.int32),
+    ('alive', np.bool_),
+)
+
+
+class Pooled:
+    """Mixin giving an entity class its own free list of recycled instances.
+
+    ``cls.acquire(*args)`` re-initialises a released instance (or makes a new
+    one) and ``release()`` hands it back, so the short-lived projectile and
+    creature objects copied into an EntityStore are reused instead of left to
+    the garbage collector. ``Pooled.pooling = False`` turns recycling off.
+    """
+
+    __slots__ = ()
+    pooling = True
+    max_free = 256
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._free = []
+
+    @classmethod
+    def acquire(cls, *args, **kwargs):
+        free = cls._free
+        obj = free.pop() if free and Pooled.pooling else cls.__new__(cls)
+        obj.__init__(*args, **kwargs)
+        return obj
+
+    def release(self):
+        free = type(self)._free
+        if Pooled.pooling and len(free) < self.max_free:
+            free.append(self)
+
+
+def _field(name):
+    return property(lambda self: self._arrays[name][:self.count],
+                    doc=f"View of the ``{name}`` column for live slots.")
+
+
+class EntityStore:
+    """Structure-of-arrays storage for creatures and projectiles.
+
+    Positions, velocities, radii, speeds, motion/type codes, colours and alive
+    flags live in NumPy arrays; ``update()`` moves every entity with
+    vectorised kernels and ``compact()`` squeezes out dead entries in place.
+    Column properties (``x``, ``y``, ``radius``, ...) return writable views of
+    the first ``count`` slots. Entities that need their own Python logic are
+    stored with ``MOVE_CUSTOM`` and keep their object alongside.
+    """
+
+    x = _field('x')
+    y = _field('y')
+    px = _field('px')
+    py = _field('py')
+    vx = _field('vx')
+    vy = _field('vy')
+    radius = _field('radius')
+    speed = _field('speed')
+    phase = _field('phase')
+    born = _field('born')
+    motion = _field('motion')
+    kind = _field('kind')
+    obj = _field('obj')
+    alive = _field('alive')
+    color = _field('color')
+
+    def __init__(self, capacity=64, bounds=(640, 480), default_color=(255, 0, 0)):
+        # Projectiles leaving (0..w, 0..h) are killed on update
+        self.bounds = bounds
+        self.default_color = default_color
+        # Simulation time stamped on entities as they are added
+        self.time = 0.0
+        self.count = 0
+        self.capacity = 0
+        self._arrays = {}
+        self._resize(capacity)
+        # Kind names (class names) indexed by kind code
+        self.kind_names = []
+        self._kind_codes = {}
+        # Custom-motion objects by id
+        self.objects = {}
+        self._next_obj_id = 0
+
+    def __len__(self):
+        return self.count
+
+    def _resize(self, capacity):
+        arrays = {name: np.zeros(capacity, dtype=dtype) for name, dtype in FIELDS}
+        arrays['color'] = np.zeros((capacity, 3), dtype=np.uint8)
+        for name, arr in self._arrays.items():
+            arrays[name][:self.count] = arr[:self.count]
+        self._arrays = arrays
+        self.capacity = capacity
+
+    def kind_code(self, name):
+        code = self._kind_codes.get(name)
+        if code is None:
+            code = self._kind_codes[name] = len(self.kind_names)
+            self.kind_names.append(name)
+        return code
+
+    def add(self, kind, x, y, vx=0.0, vy=0.0, radius=5, speed=0.0, color=None,
+            motion=MOVE_STRAIGHT, phase=0.0, obj=None):
+        """Add one entity and return its slot index."""
+        if self.count == self.capacity:
+            self._resize(self.capacity * 2)
+        i = self.count
+        a = self._arrays
+        a['x'][i] = a['px'][i] = x
+        a['y'][i] = a['py'][i] = y
+        a['vx'][i] = vx
+        a['vy'][i] = vy
+        a['radius'][i] = radius
+        a['speed'][i] = speed
+        a['phase'][i] = phase
+        a['born'][i] = self.time
+        a['motion'][i] = motion
+        a['kind'][i] = self.kind_code(kind)
+        a['color'][i] = color or self.default_color
+        a['alive'][i] = True
+        if obj is not None:
+            a['obj'][i] = self._next_obj_id
+            self.objects[self._next_obj_id] = obj
+            self._next_obj_id += 1
+        else:
+            a['obj'][i] = -1
+        self.count += 1
+        return i
+
+    def append(self, entity):
+        """Add an entity object (Creature, Laser, Snake, ...) by copying its state.
+
+        Objects without a ``motion`` class attribute are kept as custom-motion
+        entities whose own ``update(dt, tx, ty)`` drives them; copied
+        ``Pooled`` objects are released and must not be used afterwards.
+        """
+        motion = getattr(entity, 'motion', MOVE_CUSTOM)
+        i = self.add(
+            type(entity).__name__, entity.x, entity.y,
+            getattr(entity, 'vx', 0.0), getattr(entity, 'vy', 0.0),
+            entity.radius, getattr(entity, 'speed', 0.0),
+            getattr(entity, 'color', None), motion,
+            obj=entity if motion == MOVE_CUSTOM else None
+        )
+        # Copied entities are done with; pooled ones go back for reuse
+        if motion != MOVE_CUSTOM and isinstance(entity, Pooled):
+            entity.release()
+        return i
+
+    def save_positions(self):
+        """Remember current positions as the previous state for ``lerp()``."""
+        self.px[:] = self.x
+        self.py[:] = self.y
+
+    def lerp(self, alpha):
+        """Positions interpolated between the previous and current state."""
+        if alpha >= 1.0:
+            return self.x, self.y
+        px, py = self.px, self.py
+        return px + (self.x - px) * alpha, py + (self.y - py) * alpha
+
+    def update(self, dt, tx=None, ty=None):
+        """Advance every entity by ``dt`` seconds.
+
+        ``tx``/``ty`` are per-entity target coordinates for chasing motions;
+        chasers stand still without them.
+        """
+        n = self.count
+        if not n:
+            return
+        x, y, vx, vy = self.x, self.y, self.vx, self.vy
+        motion = self.motion
+        straight = motion == MOVE_STRAIGHT
+        if straight.any():
+            x[straight] += vx[straight] * dt
+            y[straight] += vy[straight] * dt
+        wiggle = motion == MOVE_WIGGLE
+        if wiggle.any():
+            phase = self.phase[wiggle] + dt * 10
+            self.phase[wiggle] = phase
+            offset = np.sin(phase) * 30
+            wvx, wvy = vx[wiggle], vy[wiggle]
+            norm = np.hypot(wvx, wvy)
+            norm[norm == 0] = 1e-6
+            x[wiggle] += wvx * dt - wvy / norm * offset * dt
+            y[wiggle] += wvy * dt + wvx / norm * offset * dt
+        # Projectiles die once they leave the play area
+        w, h = self.bounds
+        moving = straight | wiggle
+        out = moving & ((x < 0) | (x > w) | (y < 0) | (y > h))
+        self.alive[out] = False
+        if tx is None:
+            return
+        tx = np.asarray(tx, dtype=np.float64)
+        ty = np.asarray(ty, dtype=np.float64)
+        chase = motion == MOVE_CHASE
+        if chase.any():
+            self._chase(chase, tx[chase], ty[chase], dt)
+        osc = motion == MOVE_OSCILLATE
+        if osc.any():
+            phase = self.phase[osc] + dt * 5
+            self.phase[osc] = phase
+            self._chase(osc, tx[osc] + np.sin(phase) * 50, ty[osc], dt)
+        for i in np.flatnonzero(motion == MOVE_CUSTOM).tolist():
+            entity = self.objects[int(self.obj[i])]
+            entity.update(dt, float(tx[i]), float(ty[i]))
+            x[i], y[i] = entity.x, entity.y
+
+    def _chase(self, mask, tx, ty, dt):
+        dx = tx - self.x[mask]
+        dy = ty - self.y[mask]
+        dist = np.hypot(dx, dy)
+        dist[dist == 0] = 1e-6
+        step = self.speed[mask] * dt / dist
+        self.x[mask] += dx * step
+        self.y[mask] += dy * step
+
+    def compact(self):
+        """Drop dead entities, keeping the survivors in their original order."""
+        n = self.count
+        keep = self.alive.copy()
+        if keep.all():
+            return
+        dead_objs = self.obj[~keep]
+        for obj_id in dead_objs[dead_objs >= 0].tolist():
+            del self.objects[obj_id]
+        k = int(np.count_nonzero(keep))
+        for arr in self._arrays.values():
+            arr[:k] = arr[:n][keep]
+        self.count = k
+
+    def clear(self):
+        self.count = 0
+        self.objects.clear()
@@ -0,0 +1,157 @@
+from collections import OrderedDict
+
+import pygame
+
+# Transparent colour for cached sprites; not used by any game palette
+COLORKEY = (1, 2, 3)
+
+
+class RenderCache:
+    """Pre-rasterised sprites, memoised text and batched blitting for pygame.
+
+    Sprites are rendered once per key (e.g. entity kind, radius and colour)
+    onto colour-keyed surfaces; text surfaces are kept in an LRU keyed by
+    (string, colour). Draw calls are queued with ``queue()`` and submitted in
+    one ``Surface.blits`` call by ``flush()``, so callers flush before any
+    direct draw that must appear on top of queued sprites.
+    """
+
+    def __init__(self, font, max_text=256, dirty=None):
+        self.font = font
+        self.max_text = max_text
+        # Optional DirtyRects that records the area of every flushed blit
+        self.dirty = dirty
+        self.sprites = {}
+        self.texts = OrderedDict()
+        self.batch = []
+
+    def sprite(self, key, size, draw):
+        """Cached surface for ``key``, drawn by ``draw(surface)`` on first use."""
+        surf = self.sprites.get(key)
+        if surf is None:
+            surf = pygame.Surface(size)
+            surf.fill(COLORKEY)
+            draw(surf)
+            surf.set_colorkey(COLORKEY, pygame.RLEACCEL)
+            if pygame.display.get_surface() is not None:
+                surf = surf.convert()
+            self.sprites[key] = surf
+        return surf
+
+    def circle(self, kind, radius, color, width=0):
+        """Filled (or outlined) circle sprite, centred at (radius, radius)."""
+        radius = int(radius)
+        color = tuple(color)
+        return self.sprite(
+            (kind, radius, color, width), (2 * radius + 1, 2 * radius + 1),
+            lambda s: pygame.draw.circle(s, color, (radius, radius), radius, width)
+        )
+
+    def text(self, string, color):
+        """Rendered text surface, memoised with LRU eviction."""
+        key = (string, tuple(color))
+        surf = self.texts.get(key)
+        if surf is None:
+            surf = self.font.render(string, True, color)
+            self.texts[key] = surf
+            if len(self.texts) > self.max_text:
+                self.texts.popitem(last=False)
+        else:
+            self.texts.move_to_end(key)
+        return surf
+
+    def queue(self, surf, pos):
+        self.batch.append((surf, pos))
+
+    def queue_centered(self, surf, x, y):
+        self.batch.append((surf, (int(x) - surf.get_width() // 2, int(y) - surf.get_height() // 2)))
+
+    def queue_store(self, store, alpha=1.0):
+        """Queue every entity of an EntityStore as a circle sprite.
+
+        ``alpha`` interpolates between each entity's previous and current
+        position (see ``EntityStore.lerp``).
+        """
+        names = store.kind_names
+        circle = self.circle
+        batch = self.batch
+        xs, ys = store.lerp(alpha)
+        for x, y, r, col, kind in zip(xs.tolist(), ys.tolist(), store.radius.tolist(),
+                                      store.color.tolist(), store.kind.tolist()):
+            batch.append((circle(names[kind], r, col), (int(x) - r, int(y) - r)))
+
+    def flush(self, screen):
+        """Blit all queued sprites in one call."""
+        if self.batch:
+            if self.dirty is not None and self.dirty.enabled:
+                self.dirty.extend(screen.blits(self.batch))
+            else:
+                screen.blits(self.batch, doreturn=False)
+            self.batch.clear()
+
+
+def merge_rects(rects):
+    """Replace overlapping rects with their bounding rect until none overlap."""
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        i = rect.collidelist(merged)
+        while i >= 0:
+            rect.union_ip(merged.pop(i))
+            i = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+class DirtyRects:
+    """Push only the changed parts of the display each frame.
+
+    Callers ``add()`` the bounding rect of everything they draw; ``present()``
+    updates the union of this frame's and last frame's rects (so erased
+    entities are cleared too) with ``pygame.display.update(rects)``. When the
+    dirty area, with overlapping rects merged, exceeds ``max_fraction`` of
+    the screen, after ``invalidate()`` (first frame, window exposed) or when
+    disabled, it falls back to a full ``pygame.display.flip()``.
+    """
+
+    def __init__(self, size, enabled=True, max_fraction=0.5):
+        self.screen_rect = pygame.Rect((0, 0), size)
+        self.enabled = enabled
+        self.max_fraction = max_fraction
+        self.rects = []
+        self.previous = []
+        self.full = True
+
+    def add(self, rect):
+        if self.enabled:
+            self.rects.append(pygame.Rect(rect))
+
+    def extend(self, rects):
+        if self.enabled:
+            self.rects.extend(rects)
+
+    def invalidate(self):
+        """Force a full flip on the next ``present()``."""
+        self.full = True
+
+    def present(self):
+        """Send this frame to the display; returns True if it was a full flip."""
+        if not self.enabled:
+            pygame.display.flip()
+            return True
+        clip = self.screen_rect.clip
+        rects = [r for r in map(clip, self.previous + self.rects) if r.w and r.h]
+        self.previous, self.rects = self.rects, []
+        limit = self.max_fraction * self.screen_rect.w * self.screen_rect.h
+        area = sum(r.w * r.h for r in rects)
+        if area > limit:
+            # Overlaps are counted more than once in the sum; the union may still fit
+            rects = merge_rects(rects)
+            area = sum(r.w * r.h for r in rects)
+        full = self.full or area > limit
+        self.full = False
+        if full:
+            pygame.display.flip()
+        elif rects:
+            pygame.display.update(rects)
+        return full
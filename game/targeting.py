@@ -0,0 +1,64 @@
+import numpy as np
+
+
+class AvatarTargets:
+    """Entity-to-avatar distances for one tick, shared by targeting and collisions.
+
+    ``measure()`` computes the full (entities, avatars) distance matrix in one
+    NumPy operation; ``nearest()`` turns it into per-entity target indices and
+    ``within()`` into contact pairs, so chasing, player damage and mouth
+    trapping all read the same matrix instead of looping over avatars.
+    """
+
+    def __init__(self, centers=()):
+        self.set_centers(centers)
+        self.dist = np.empty((0, len(self.cx)))
+
+    def set_centers(self, centers):
+        centers = np.asarray(centers, dtype=np.float64).reshape(-1, 2)
+        self.cx, self.cy = centers[:, 0], centers[:, 1]
+
+    def measure(self, x, y):
+        """Distance matrix (len(x), avatars) for entities at (x, y)."""
+        x = np.atleast_1d(np.asarray(x, dtype=np.float64))
+        y = np.atleast_1d(np.asarray(y, dtype=np.float64))
+        self.x, self.y = x, y
+        self.dist = np.hypot(x[:, None] - self.cx[None, :], y[:, None] - self.cy[None, :])
+        return self.dist
+
+    def nearest(self):
+        """Index of the nearest avatar per measured entity (-1 with no avatars)."""
+        if not self.dist.shape[1]:
+            return np.full(len(self.dist), -1)
+        return self.dist.argmin(axis=1)
+
+    def target_xy(self):
+        """(tx, ty) of the nearest avatar per entity; entities stay put with no avatars."""
+        idx = self.nearest()
+        if not len(self.cx):
+            return self.x.copy(), self.y.copy()
+        return self.cx[idx], self.cy[idx]
+
+    def nearest_center(self, x, y, default=(320, 240)):
+        """Nearest avatar centre to a single point, e.g. a boss."""
+        if not len(self.cx):
+            return default
+        i = int(np.argmin(np.hypot(self.cx - x, self.cy - y)))
+        return float(self.cx[i]), float(self.cy[i])
+
+    def within(self, radius, avatars=None):
+        """(entity, avatar) pairs closer than ``radius``, sorted by entity then avatar.
+
+        ``radius`` may be a scalar or per-entity array; ``avatars`` restricts
+        the check to a subset of avatar indices.
+        """
+        radius = np.asarray(radius, dtype=np.float64)
+        if radius.ndim:
+            radius = radius[:, None]
+        hit = self.dist < radius
+        if avatars is not None:
+            mask = np.zeros(hit.shape[1], dtype=bool)
+            mask[list(avatars)] = True
+            hit &= mask[None, :]
+        ej, ai = np.nonzero(hit)
+        return ej, ai
@@ -0,0 +1,35 @@
+class FixedTimestep:
+    """Accumulator running the simulation at a fixed tick, independent of frame rate.
+
+    Each rendered frame calls ``advance(frame_dt)`` and runs that many
+    simulation steps of ``dt`` seconds; ``alpha`` is the fraction of a step
+    left over, used to interpolate rendering between the last two states.
+    After a stall at most ``max_steps`` steps run and the rest of the
+    backlog is dropped, so a hitch slows the game briefly instead of
+    fast-forwarding it.
+    """
+
+    def __init__(self, dt=1/60, max_steps=5):
+        self.dt = dt
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.alpha = 0.0
+        self.ticks = 0
+
+    def advance(self, frame_dt):
+        """Add ``frame_dt`` seconds and return how many steps to run now."""
+        self.accumulator += max(0.0, frame_dt)
+        # The epsilon keeps step counts stable against float rounding in
+        # frame_dt, e.g. when replaying recorded timestamps
+        steps = int(self.accumulator / self.dt + 1e-6)
+        if steps > self.max_steps:
+            steps = self.max_steps
+            self.accumulator = steps * self.dt
+        self.accumulator = max(0.0, self.accumulator - steps * self.dt)
+        self.alpha = self.accumulator / self.dt
+        self.ticks += steps
+        return steps
+
+    def reset(self):
+        self.accumulator = 0.0
+        self.alpha = 0.0
@@ -0,0 +1,323 @@
+import math
+import random
+
+import numpy as np
+
+from face_controls.metrics import as_batch
+from face_controls.profiling import NULL_PROFILER
+from game.actors import (AlienKingBoss, ArticalBoss, Caster, Creature, Dragon,
+                         ElderPortal, FireSpinner, Fireball, FlameWarden, Ghost,
+                         Laser, MadackedaBoss, RamBoss, ShadowBoss, Skeleton,
+                         SnowKing, Snowie, SpinnerBoss, TrackerBoss, VortexBoss)
+from game.budget import ProjectileBudget
+from game.collision import SpatialHash
+from game.entities import EntityStore
+from game.targeting import AvatarTargets
+
+# Kills needed in each minion wave before its boss appears
+KILL_TARGETS = [20, 30, 40, 50, 60, 70, 80, 90, 100, 120]
+
+# Boss class and game state for each wave, in order
+BOSS_WAVES = [
+    (SnowKing, 'boss_snow'),
+    (FlameWarden, 'boss_fire'),
+    (VortexBoss, 'boss_vortex'),
+    (SpinnerBoss, 'boss_spinner'),
+    (RamBoss, 'boss_ram'),
+    (TrackerBoss, 'boss_tracker'),
+    (ArticalBoss, 'boss_artical'),
+    (ShadowBoss, 'boss_shadow'),
+    (AlienKingBoss, 'boss_alienking'),
+    (MadackedaBoss, 'boss_madackeda'),
+]
+
+# Avatar head radius; contact, trap and eye positions are derived from it
+AVATAR_RADIUS = 100
+
+
+class GameWorld:
+    """Headless game simulation: waves, bosses, projectiles and player lives.
+
+    ``step()`` advances the world by ``dt`` seconds from one tick of
+    perception input (face metrics dicts, wrist positions and voice level)
+    and never touches the camera, audio or display, so it runs without an
+    SDL window. All randomness goes through ``self.rng``; two worlds with the
+    same seed fed the same inputs evolve identically.
+    """
+
+    def __init__(self, size=(640, 480), seed=None, kill_targets=KILL_TARGETS, profiler=None,
+                 budget=None):
+        self.size = size
+        # Timing spans for the simulation and its collision passes
+        self.profiler = profiler or NULL_PROFILER
+        self.rng = random.Random(seed)
+        self.kill_targets = list(kill_targets)
+        # Entity stores for creatures and projectiles
+        self.creatures = EntityStore(bounds=size, default_color=(0, 255, 0))
+        self.lasers = EntityStore(bounds=size, default_color=(255, 0, 0))
+        self.snakes = EntityStore(bounds=size, default_color=(50, 200, 50))  # XYZ's snake attacks
+        # Hand fire cooldowns and the cap on live lasers and snakes
+        self.budget = budget or ProjectileBudget()
+        self.fireballs = []  # for boss ranged attacks
+        self.portals = []  # Elder dimension portals
+        self.gary_boss = None  # Gary ignores boss phases
+        self.elder_dimension_active = False
+        # Avatar targeting/contact distances and laser broad phase, per tick
+        self.targets = AvatarTargets()
+        self.laser_grid = SpatialHash()
+        # Avatars, player lives and invulnerability timers
+        self.centers = []
+        self.player_lives = []
+        self.invul_timers = []
+        self.amp = 0.0
+        # Wave and boss sequencing
+        self.wave_kills = 0
+        self.wave_index = 0
+        self.boss = None
+        self.state = 'minions'
+        # Simulated time drives spawning, so replays do not depend on wall time
+        self.time = 0.0
+        self.last_spawn = 0.0
+        self.spawn_interval = 1.5
+        # Boss, Gary and XYZ positions before the last step, by id
+        self._prev_pos = {}
+
+    def open_portal(self):
+        """Open an Elder Dimension portal at a random spot (the P key)."""
+        if self.elder_dimension_active:
+            return None
+        screen_w, screen_h = self.size
+        portal = ElderPortal(self.rng.randint(100, screen_w - 100),
+                             self.rng.randint(100, screen_h - 100), self)
+        self.portals.append(portal)
+        return portal
+
+    def _hurt(self, i, damage=1):
+        self.player_lives[i] -= damage
+        self.invul_timers[i] = 2.0
+        # respawn logic: if no lives, reset
+        if self.player_lives[i] <= 0:
+            self.player_lives[i] = 3
+            self.invul_timers[i] = 2.0
+
+    def step(self, dt, metrics_list, hand_positions=(), amp=0.0):
+        """Advance the simulation by ``dt`` seconds.
+
+        ``metrics_list`` is a FaceMetricsBatch, or a list of FaceMetrics or
+        per-face dicts.
+        """
+        with self.profiler.span('simulation'):
+            self._step(dt, as_batch(metrics_list), hand_positions, amp)
+
+    def lerp(self, obj, alpha):
+        """(x, y) of a boss, Gary or XYZ interpolated between the last two steps."""
+        prev = self._prev_pos.get(id(obj))
+        if prev is None or prev[0] is not obj or alpha >= 1.0:
+            return obj.x, obj.y
+        _, px, py = prev
+        return px + (obj.x - px) * alpha, py + (obj.y - py) * alpha
+
+    def _step(self, dt, metrics_list, hand_positions, amp):
+        self.time += dt
+        self.amp = amp
+        creatures, lasers, snakes = self.creatures, self.lasers, self.snakes
+        lasers.time = snakes.time = self.time
+        budget = self.budget
+        # Previous state for render interpolation
+        creatures.save_positions(); lasers.save_positions(); snakes.save_positions()
+        movers = [self.boss, self.gary_boss, self.gary_boss and self.gary_boss.riding_xyz]
+        self._prev_pos = {id(o): (o, o.x, o.y) for o in movers if o}
+        targets, laser_grid = self.targets, self.laser_grid
+        player_lives, invul_timers = self.player_lives, self.invul_timers
+        screen_w, screen_h = self.size
+        rng = self.rng
+        # Hand-based attacks from detected wrist positions, each hand on a cooldown
+        for wx, wy in budget.allow_hands(hand_positions, self.time):
+            # fire hand-based projectile towards screen center
+            tx, ty = screen_w // 2, screen_h // 2
+            dx_h, dy_h = tx - wx, ty - wy
+            mag_h = math.hypot(dx_h, dy_h) or 1e-6
+            vx_h, vy_h = dx_h / mag_h * 300, dy_h / mag_h * 300
+            lasers.append(Fireball.acquire(wx, wy, vx_h, vy_h))
+        # Sync player lives/invulnerability with detected faces
+        n = len(metrics_list)
+        # Initialize lives and invulnerability for each new player
+        while len(player_lives) < n:
+            player_lives.append(3)
+            invul_timers.append(0.0)
+        # Trim for removed faces
+        del player_lives[n:], invul_timers[n:]
+        # Decrease invulnerability timers
+        for i in range(n):
+            if invul_timers[i] > 0:
+                invul_timers[i] = max(0.0, invul_timers[i] - dt)
+        # Determine avatar positions evenly across screen
+        centers = self.centers = [
+            (int((i+1) * screen_w / (n+1)), screen_h // 2)
+            for i in range(n)
+        ]
+        # Spawn creatures (minion waves)
+        if self.state == 'minions':
+            if self.time - self.last_spawn > self.spawn_interval:
+                # Randomly choose from diverse enemies
+                r = rng.random()
+                if r < 0.4:
+                    kind = Creature
+                elif r < 0.6:
+                    kind = Snowie
+                elif r < 0.75:
+                    kind = FireSpinner
+                elif r < 0.85:
+                    kind = Ghost
+                elif r < 0.92:
+                    kind = Skeleton
+                elif r < 0.98:
+                    kind = Caster
+                else:
+                    kind = Dragon
+                creatures.append(kind.acquire(0, 0, screen_w, screen_h, rng))
+                self.last_spawn = self.time
+        # Fire lasers on blink per avatar (always enabled)
+        blinking = np.flatnonzero(metrics_list.blink)
+        if len(blinking):
+            # Direction based on head pose, for all blinking faces at once
+            yaw = np.clip(metrics_list.yaw[blinking] / (math.pi/2), -1, 1)
+            pitch = np.clip(metrics_list.pitch[blinking] / (math.pi/2), -1, 1)
+            dx = yaw * 100; dy = -pitch * 100
+            mag = np.hypot(dx, dy)
+            aimed = mag >= 1e-3
+            safe = np.where(aimed, mag, 1.0)
+            vxs = np.where(aimed, dx / safe * 400, 0.0).tolist()
+            vys = np.where(aimed, dy / safe * 400, -400.0).tolist()
+            eye_off_x = AVATAR_RADIUS * 0.4; eye_off_y = -AVATAR_RADIUS * 0.2
+            for i, vx, vy in zip(blinking.tolist(), vxs, vys):
+                # Fire from both eyes of avatar i
+                cx_i, cy_i = centers[i]
+                lasers.append(Laser.acquire(cx_i - eye_off_x, cy_i + eye_off_y, vx, vy))
+                lasers.append(Laser.acquire(cx_i + eye_off_x, cy_i + eye_off_y, vx, vy))
+        # Update lasers
+        lasers.update(dt)
+        lasers.compact()
+        # Update snakes
+        snakes.update(dt)
+        snakes.compact()
+        # Update portals
+        for p in self.portals:
+            p.update(dt)
+        # Update Gary (always, even during boss phases)
+        gary_boss = self.gary_boss
+        if gary_boss:
+            nearest_center = centers[0] if centers else (screen_w // 2, screen_h // 2)
+            gary_boss.update(dt, nearest_center[0], nearest_center[1], metrics_list, centers)
+        # Update creatures: chase nearest avatar
+        targets.set_centers(centers)
+        targets.measure(creatures.x, creatures.y)
+        tx, ty = targets.target_xy()
+        creatures.update(dt, tx, ty)
+        with self.profiler.span('collision'):
+            # Creature-to-avatar distances after moving, shared by the damage and
+            # trap checks; lasers go through the spatial hash broad phase
+            targets.measure(creatures.x, creatures.y)
+            laser_grid.build(lasers.x, lasers.y, lasers.radius)
+            c_alive, l_alive, s_alive = creatures.alive, lasers.alive, snakes.alive
+            # Creature collisions: damage players and remove collided creatures
+            cj, pi = targets.within(creatures.radius + AVATAR_RADIUS)
+            for j, i in zip(cj.tolist(), pi.tolist()):
+                if c_alive[j] and invul_timers[i] <= 0:
+                    self._hurt(i)
+                    c_alive[j] = False
+            # Trap creatures if avatar mouth is open
+            trap_radius = int(AVATAR_RADIUS * 0.6)
+            open_mouths = np.flatnonzero(metrics_list.mouth_open_ratio > 0.03).tolist()
+            if open_mouths:
+                cj, _ = targets.within(trap_radius, open_mouths)
+                trapped = np.unique(cj)
+                trapped = trapped[c_alive[trapped]]
+                self.wave_kills += len(trapped)
+                c_alive[trapped] = False
+            # Laser hits on creatures: each laser kills at most one creature
+            cj, lk = laser_grid.query(creatures.x, creatures.y, creatures.radius)
+            for j, k in zip(cj.tolist(), lk.tolist()):
+                if c_alive[j] and l_alive[k]:
+                    c_alive[j] = False; self.wave_kills += 1; l_alive[k] = False
+            creatures.compact()
+            # Snake collisions with players
+            targets.measure(snakes.x, snakes.y)
+            sk, pi = targets.within(snakes.radius + AVATAR_RADIUS)
+            for k, i in zip(sk.tolist(), pi.tolist()):
+                if s_alive[k] and invul_timers[i] <= 0:
+                    self._hurt(i)
+                    s_alive[k] = False
+        # Gary attacks (melee damage)
+        if gary_boss and (not gary_boss.being_looked_at or gary_boss.provoked):
+            for i, (cx_i, cy_i) in enumerate(centers):
+                if invul_timers[i] <= 0 and math.hypot(gary_boss.x - cx_i, gary_boss.y - cy_i) < (gary_boss.radius + AVATAR_RADIUS):
+                    self._hurt(i, 2)  # Gary does double damage
+        # Transition to boss when wave_kills reaches target
+        if self.state == 'minions' and self.wave_kills >= self.kill_targets[self.wave_index]:
+            # Initialize appropriate boss based on wave index
+            bx, by = centers[0] if centers else (screen_w // 2, screen_h // 2)
+            boss_cls, self.state = BOSS_WAVES[self.wave_index % len(BOSS_WAVES)]
+            self.boss = boss_cls(bx, by, self)
+            # Reset wave_kills and clear minions/lasers for boss phase
+            self.wave_kills = 0
+            creatures.clear(); lasers.clear(); snakes.clear()
+        # Update boss phases (all bosses)
+        boss = self.boss
+        if boss is not None:
+            # Determine nearest avatar for targeting
+            tgt = targets.nearest_center(boss.x, boss.y, (screen_w // 2, screen_h // 2))
+            # Call subclass update for movement and abilities
+            boss.update(dt, tgt[0], tgt[1])
+            # Phase-specific spawn logic for early bosses
+            if self.state == 'boss_snow':
+                boss.spawn_timer += dt
+                if boss.spawn_timer >= boss.spawn_interval:
+                    creatures.append(Snowie.acquire(boss.x, boss.y, screen_w, screen_h, rng))
+                    boss.spawn_timer = 0.0
+            elif self.state == 'boss_fire':
+                boss.spawn_timer += dt
+                if boss.spawn_timer >= boss.spawn_interval:
+                    creatures.append(FireSpinner.acquire(boss.x, boss.y, screen_w, screen_h, rng))
+                    boss.spawn_timer = 0.0
+            # Creature spawn disabled for other boss phases
+            # Boss damage to players on contact
+            for i, (cx_i, cy_i) in enumerate(centers):
+                if invul_timers[i] <= 0 and math.hypot(boss.x - cx_i, boss.y - cy_i) < (boss.radius + AVATAR_RADIUS):
+                    self._hurt(i)
+            # Laser hits on boss (unless shielded)
+            if not getattr(boss, 'shield_active', False):
+                _, lk = laser_grid.query(boss.x, boss.y, boss.radius)
+                lk = lk[l_alive[lk]]
+                boss.health -= len(lk)
+                l_alive[lk] = False
+        # Gary boss takes damage (when not being looked at)
+        if gary_boss and not gary_boss.being_looked_at:
+            _, lk = laser_grid.query(gary_boss.x, gary_boss.y, gary_boss.radius)
+            # Each live laser costs one health; the rest pass once Gary falls
+            lk = lk[l_alive[lk]][:max(gary_boss.health, 0)]
+            gary_boss.health -= len(lk)
+            l_alive[lk] = False
+            if gary_boss.health <= 0:
+                self.gary_boss = None
+                self.elder_dimension_active = False
+        # Boss defeat and wave progression
+        if boss is not None and boss.health <= 0:
+            self.wave_index += 1
+            if self.wave_index < len(self.kill_targets):
+                self.state = 'minions'
+            else:
+                self.state = 'victory'
+                creatures.clear()
+                lasers.clear()
+                self.fireballs.clear()
+            self.boss = None
+        # Drop projectiles spent this tick so renderers only see live ones
+        lasers.compact(); snakes.compact()
+        # Keep the projectile population bounded, evicting the oldest first
+        budget.enforce(lasers, snakes)
+        profiler = self.profiler
+        if profiler.enabled:
+            profiler.counter('projectiles', len(lasers) + len(snakes))
+            for name, value in budget.counters.items():
+                profiler.counter(name, value)
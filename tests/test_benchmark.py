@@ -0,0 +1,36 @@
+import time
+
+import numpy as np
+import pytest
+
+from face_controls import benchmark
+from face_controls.sources import ArraySource
+
+
+class FakeFaceController:
+    """FaceController stand-in that reads the source and spends 2 ms per frame."""
+
+    def __init__(self, source, **kwargs):
+        self.cap = source
+
+    def grab(self, wait=False):
+        ret, frame = self.cap.read()
+        return ret, frame, time.perf_counter(), True
+
+    def track(self, frame, ts, img_rgb):
+        time.sleep(0.002)
+        return []
+
+    def release(self):
+        self.cap.release()
+
+
+@pytest.mark.parametrize('warmup', [0, 3])
+def test_run_measures_every_frame_after_warmup(monkeypatch, warmup):
+    monkeypatch.setattr(benchmark, 'FaceController', FakeFaceController)
+    frames = [np.zeros((24, 32, 3), np.uint8)] * (5 + warmup)
+    result = benchmark.run(ArraySource(frames), max_frames=5, warmup=warmup, hands=False)
+    assert result['frames'] == 5
+    assert len(result['stages']) == 4
+    # The measured span covers all five frames of at least 2 ms each
+    assert 0 < result['fps'] <= 500
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from game.collision import SpatialHash
+
+
+def brute_force(qx, qy, qr, x, y, r, include_radius=True):
+    pairs = []
+    for q in range(len(qx)):
+        for i in range(len(x)):
+            limit = qr[q] + r[i] if include_radius else qr[q]
+            if np.hypot(qx[q] - x[i], qy[q] - y[i]) < limit:
+                pairs.append((q, i))
+    return pairs
+
+
+def as_pairs(result):
+    qi, ii = result
+    return list(zip(qi.tolist(), ii.tolist()))
+
+
+@pytest.mark.parametrize('include_radius', [True, False])
+@pytest.mark.parametrize('seed', range(5))
+def test_query_matches_brute_force(seed, include_radius):
+    rng = np.random.default_rng(seed)
+    # Spread over negative coordinates too
+    x, y = rng.uniform(-300, 700, 200), rng.uniform(-300, 500, 200)
+    r = rng.integers(2, 30, 200).astype(float)
+    qx, qy = rng.uniform(-300, 700, 50), rng.uniform(-300, 500, 50)
+    qr = rng.uniform(1, 150, 50)
+    grid = SpatialHash(cell_size=64).build(x, y, r)
+    # Same order as a nested loop over queries, then items
+    assert as_pairs(grid.query(qx, qy, qr, include_radius)) == \
+        brute_force(qx, qy, qr, x, y, r, include_radius)
+
+
+def test_cell_boundaries():
+    # Items on and either side of cell edges, including negative cells
+    edges = np.array([-128.0, -64.0, -0.5, 0.0, 63.999, 64.0, 128.0])
+    x, y = np.meshgrid(edges, edges)
+    x, y = x.ravel(), y.ravel()
+    r = np.full(len(x), 1.0)
+    grid = SpatialHash(cell_size=64).build(x, y, r)
+    qx, qy = x.copy(), y.copy()
+    qr = np.full(len(qx), 64.5)
+    assert as_pairs(grid.query(qx, qy, qr)) == brute_force(qx, qy, qr, x, y, r)
+
+
+def test_touching_circles_do_not_overlap():
+    grid = SpatialHash(cell_size=64).build([0.0, 100.0], [0.0, 0.0], [10.0, 10.0])
+    assert as_pairs(grid.query([50.0], [0.0], [40.0])) == []
+    assert as_pairs(grid.query([50.0], [0.0], [40.001])) == [(0, 0), (0, 1)]
+
+
+def test_empty():
+    grid = SpatialHash().build([], [], [])
+    assert len(grid) == 0
+    assert as_pairs(grid.query([1.0], [1.0], [5.0])) == []
+    grid.build([1.0], [1.0], [1.0])
+    assert as_pairs(grid.query([], [], [])) == []
@@ -0,0 +1,88 @@
+import random
+
+import numpy as np
+import pytest
+
+from game.actors import Creature, Dragon, Laser, Snake
+from game.entities import MOVE_CUSTOM, EntityStore, Pooled
+
+
+@pytest.fixture(autouse=True)
+def no_pooling(monkeypatch):
+    # Scalar reference objects stay ours after the store copies them
+    monkeypatch.setattr(Pooled, 'pooling', False)
+
+
+class Walker:
+    """Custom-motion entity."""
+
+    def __init__(self, x, y):
+        self.x, self.y, self.radius = x, y, 4
+
+    def update(self, dt, tx, ty):
+        self.x += 1.0
+
+
+def test_add_grows_and_compact_keeps_order():
+    store = EntityStore(capacity=2)
+    for k in range(10):
+        store.add('dot', float(k), float(-k), radius=k)
+    walker = Walker(5.0, 5.0)
+    store.append(walker)
+    assert len(store) == 11 and store.capacity >= 11
+    assert store.kind_names == ['dot', 'Walker']
+    assert store.motion[-1] == MOVE_CUSTOM and store.objects[int(store.obj[-1])] is walker
+    store.alive[[1, 4, 5]] = False
+    store.compact()
+    assert store.x.tolist() == [0.0, 2.0, 3.0, 6.0, 7.0, 8.0, 9.0, 5.0]
+    assert store.radius.tolist()[:7] == [0, 2, 3, 6, 7, 8, 9]
+    # Removing a custom entity drops its object
+    store.alive[-1] = False
+    store.compact()
+    assert len(store) == 7 and not store.objects
+    store.compact()
+    assert len(store) == 7
+    store.clear()
+    assert len(store) == 0
+
+
+def test_kernels_match_scalar_updates():
+    rng = random.Random(3)
+    creatures = [Creature(320, 240, 640, 480, rng) for _ in range(10)]
+    creatures += [Dragon(320, 240, 640, 480, rng) for _ in range(5)]
+    walker = Walker(100.0, 100.0)
+    store = EntityStore()
+    for entity in creatures + [walker]:
+        store.append(entity)
+    targets = [(rng.uniform(0, 640), rng.uniform(0, 480)) for _ in creatures]
+    tx = np.array([t[0] for t in targets] + [0.0])
+    ty = np.array([t[1] for t in targets] + [0.0])
+    for _ in range(120):
+        store.update(1/60, tx, ty)
+        for entity, (cx, cy) in zip(creatures, targets):
+            entity.update(1/60, cx, cy)
+    np.testing.assert_allclose(store.x[:-1], [c.x for c in creatures], rtol=1e-9)
+    np.testing.assert_allclose(store.y[:-1], [c.y for c in creatures], rtol=1e-9)
+    assert (store.x[-1], store.y[-1]) == (walker.x, walker.y) == (220.0, 100.0)
+
+
+def test_projectile_kernels_match_scalar_updates():
+    rng = random.Random(4)
+    projectiles = [Laser(rng.uniform(100, 540), rng.uniform(100, 380),
+                         rng.uniform(-200, 200), rng.uniform(-200, 200)) for _ in range(10)]
+    projectiles += [Snake(rng.uniform(100, 540), rng.uniform(100, 380),
+                          rng.uniform(0, 640), rng.uniform(0, 480)) for _ in range(10)]
+    store = EntityStore()
+    for entity in projectiles:
+        store.append(entity)
+    for _ in range(90):
+        store.update(1/60)
+        for entity in projectiles:
+            if entity.active:
+                entity.update(1/60)
+        # Both kill projectiles that leave the screen on the same step
+        assert store.alive.tolist() == [p.active for p in projectiles]
+    live = [p for p in projectiles if p.active]
+    assert live and len(live) < len(projectiles)
+    np.testing.assert_allclose(store.x[store.alive], [p.x for p in live], rtol=1e-9)
+    np.testing.assert_allclose(store.y[store.alive], [p.y for p in live], rtol=1e-9)
@@ -0,0 +1,84 @@
+import threading
+from types import SimpleNamespace
+
+from face_controls.face import MAX_FACES, OVERLAY_FULL, FaceController
+from face_controls.governor import QUALITY_LEVELS, QualityGovernor, apply_quality
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_face():
+    """FaceController with a stand-in FaceMesh factory, without a camera."""
+    face = FaceController.__new__(FaceController)
+    face.mp_face_mesh = SimpleNamespace(FaceMesh=lambda **kwargs: SimpleNamespace(**kwargs))
+    face.detection_confidence = face.tracking_confidence = 0.5
+    face.refine_landmarks = True
+    face.inference_scale = 1.0
+    face.max_num_faces = MAX_FACES
+    face.face_mesh = face._make_mesh(MAX_FACES)
+    face.roi_tracker = None
+    face.overlay = OVERLAY_FULL
+    face._pending_quality = {}
+    face._quality_lock = threading.Lock()
+    return face
+
+
+def test_set_quality_is_applied_by_the_inference_thread():
+    face = make_face()
+    mesh = face.face_mesh
+    face.set_quality(refine_landmarks=False, inference_scale=0.5)
+    # Nothing changes under a FaceMesh call that may be running
+    assert face.face_mesh is mesh and face.inference_scale == 1.0
+    face._apply_quality()
+    assert face.face_mesh is not mesh and not face.face_mesh.refine_landmarks
+    assert face.face_mesh.max_num_faces == MAX_FACES
+    assert face.inference_scale == 0.5
+
+
+def test_quality_levels_keep_searching_for_every_face():
+    face = make_face()
+    hands = SimpleNamespace(inference_scale=1.0)
+    pipeline = SimpleNamespace(face=face, hands=hands, hands_every=1)
+    for quality in QUALITY_LEVELS:
+        apply_quality(quality, pipeline=pipeline)
+        face._apply_quality()
+        assert face.max_num_faces == MAX_FACES
+        assert pipeline.hands_every == quality.hands_every
+        assert hands.inference_scale == quality.inference_scale
+
+
+def test_governor_steps_down_and_back_up():
+    clock = Clock()
+    changes = []
+    governor = QualityGovernor(60, on_change=changes.append, window=10, hold=1.0, clock=clock)
+    for _ in range(10):
+        governor.update(1 / 30)
+    assert governor.level == 1 and changes == [QUALITY_LEVELS[1]]
+    for _ in range(20):
+        clock.now += 0.2
+        governor.update(1 / 60, busy=0.002)
+    assert governor.level == 0 and changes[-1] == QUALITY_LEVELS[0]
+
+
+def test_governor_counts_slow_inference_on_another_thread():
+    clock = Clock()
+    governor = QualityGovernor(60, window=10, hold=1.0, clock=clock)
+    # The loop keeps 60 FPS while inference takes two frames
+    for _ in range(10):
+        governor.update(1 / 60, busy=0.005, inference=1 / 30)
+    assert governor.level == 1
+    # Fast rendering alone does not restore quality while inference is busy
+    for _ in range(30):
+        clock.now += 0.2
+        governor.update(1 / 60, busy=0.002, inference=0.014)
+    assert governor.level == 1
+    for _ in range(30):
+        clock.now += 0.2
+        governor.update(1 / 60, busy=0.002, inference=0.005)
+    assert governor.level == 0
@@ -0,0 +1,74 @@
+import math
+import random
+from types import SimpleNamespace
+
+import numpy as np
+
+from face_controls.face import FaceController
+from face_controls.landmarks import METRIC_IDXS, compute_metrics, landmarks_to_array
+
+W, H = 640, 480
+
+
+def make_faces(count, seed=0):
+    """MediaPipe-like faces of 478 normalised landmarks."""
+    rng = random.Random(seed)
+    return [SimpleNamespace(landmark=[SimpleNamespace(x=rng.random(), y=rng.random(),
+                                                      z=rng.uniform(-0.1, 0.1))
+                                      for _ in range(478)])
+            for _ in range(count)]
+
+
+def reference_metrics(face, w, h):
+    # The per-landmark code the vectorized metrics replaced
+    lm = face.landmark
+    image_points = [(lm[i].x * w, lm[i].y * h) for i in (1, 152, 33, 263, 61, 291)]
+    ul = np.array([lm[13].x * w, lm[13].y * h])
+    ll = np.array([lm[14].x * w, lm[14].y * h])
+    ml = np.array([lm[61].x * w, lm[61].y * h])
+    mr = np.array([lm[291].x * w, lm[291].y * h])
+    vd = np.linalg.norm(ul - ll)
+    hd = np.linalg.norm(ml - mr)
+    mouth = vd / hd if hd > 0 else 0.0
+
+    def ear(idxs):
+        p1, p2, p3, p4, p5, p6 = [(lm[i].x * w, lm[i].y * h) for i in idxs]
+        v1 = math.hypot(p2[0] - p6[0], p2[1] - p6[1])
+        v2 = math.hypot(p3[0] - p5[0], p3[1] - p5[1])
+        hd = math.hypot(p1[0] - p4[0], p1[1] - p4[1]) or 1e-6
+        return (v1 + v2) / (2.0 * hd)
+    ears = (ear([33, 160, 158, 133, 153, 144]), ear([362, 385, 387, 263, 373, 380]))
+    return ears, mouth, (lm[1].x * w, lm[1].y * h), image_points
+
+
+def test_metrics_match_per_landmark_code():
+    faces = make_faces(4)
+    compact = landmarks_to_array(faces, W, H, idxs=METRIC_IDXS)
+    assert compact.shape == (4, len(METRIC_IDXS), 3)
+    full = landmarks_to_array(faces, W, H)
+    for pts in (compact, full):
+        derived = compute_metrics(pts)
+        for i, face in enumerate(faces):
+            ears, mouth, nose, image_points = reference_metrics(face, W, H)
+            np.testing.assert_allclose(derived['ear'][i], ears, rtol=1e-12)
+            np.testing.assert_allclose(derived['mouth_open_ratio'][i], mouth, rtol=1e-12)
+            np.testing.assert_allclose(derived['nose'][i], nose, rtol=1e-12)
+            np.testing.assert_allclose(derived['image_points'][i], image_points, rtol=1e-12)
+
+
+def test_full_mesh_is_converted_on_first_use():
+    faces = make_faces(2)
+    face = FaceController.__new__(FaceController)
+    face._landmark_cache = (None, None)
+    face._landmark_source = (faces, W, H)
+    landmarks = face.landmarks
+    np.testing.assert_array_equal(landmarks, landmarks_to_array(faces, W, H))
+    assert face.landmarks is landmarks
+    # A newer frame replaces the cached conversion
+    face._landmark_source = (faces[:1], W, H)
+    assert face.landmarks.shape == (1, 478, 3)
+
+
+def test_no_faces():
+    assert landmarks_to_array([], W, H, idxs=METRIC_IDXS).shape == (0, len(METRIC_IDXS), 3)
+    assert compute_metrics(np.empty((0, len(METRIC_IDXS), 3)))['ear'].shape == (0, 2)
@@ -0,0 +1,101 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from face_controls.metrics import FaceMetricsBatch
+from face_controls.pipeline import PerceptionPipeline, PerceptionResult, PerceptionThread
+
+
+class FakeFace:
+    predicting = True
+
+    def __init__(self):
+        self.predicted = []
+
+    def predict(self, ts):
+        self.predicted.append(ts)
+        batch = FaceMetricsBatch.empty(1)
+        batch.yaw[:] = len(self.predicted)
+        return batch
+
+
+class FakePipeline:
+    """Produces one result, then blocks until released."""
+
+    def __init__(self, face):
+        self.face = face
+        self.done = threading.Event()
+        self.calls = 0
+
+    def read(self, wait=False):
+        self.calls += 1
+        if self.calls > 1:
+            self.done.wait()
+            return PerceptionResult(FaceMetricsBatch(), [], None, 0.0)
+        batch = FaceMetricsBatch.empty(1)
+        batch.blink[:] = True
+        return PerceptionResult(batch, [(1, 2)], np.zeros((2, 2, 3), np.uint8), 1.0)
+
+    def release(self):
+        self.done.set()
+
+
+def wait_for_result(thread):
+    for _ in range(200):
+        if thread._seq:
+            return thread.read()
+        threading.Event().wait(0.005)
+    raise AssertionError("no result")
+
+
+def test_thread_predicts_between_results():
+    face = FakeFace()
+    thread = PerceptionThread(FakePipeline(face))
+    try:
+        first = wait_for_result(thread)
+        assert first.metrics.blink.tolist() == [True]
+        repeated = thread.read()
+        # Extrapolated by the face filters, without re-firing the blink
+        assert face.predicted
+        assert repeated.metrics.yaw.tolist() == [float(len(face.predicted))]
+        assert repeated.metrics.blink.tolist() == [False]
+        assert repeated.hands == [(1, 2)] and repeated.frame is first.frame
+    finally:
+        thread.release()
+
+
+def test_thread_repeats_without_prediction():
+    face = FakeFace()
+    face.predicting = False
+    thread = PerceptionThread(FakePipeline(face))
+    try:
+        wait_for_result(thread)
+        repeated = thread.read()
+        assert not face.predicted
+        assert repeated.metrics.blink.tolist() == [False]
+    finally:
+        thread.release()
+
+
+class SlowFace:
+    """Waits 50 ms for each camera frame and spends 5 ms tracking it."""
+
+    predicting = False
+
+    def grab(self, wait=False):
+        time.sleep(0.05)
+        return True, np.zeros((4, 4, 3), np.uint8), time.perf_counter(), True
+
+    def track(self, frame, ts, img_rgb):
+        time.sleep(0.005)
+        return FaceMetricsBatch()
+
+
+def test_pipeline_times_inference_without_the_capture_wait():
+    hands = SimpleNamespace(process=lambda img: [])
+    pipeline = PerceptionPipeline(SlowFace(), hands)
+    assert pipeline.inference_time == 0.0
+    pipeline.read(wait=True)
+    assert 0.005 <= pipeline.inference_time < 0.05
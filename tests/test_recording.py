@@ -0,0 +1,120 @@
+import random
+
+import numpy as np
+import pytest
+
+from face_controls.metrics import FaceMetricsBatch
+from face_controls.recording import EVENT_PORTAL, PerceptionRecorder, PerceptionReplay
+from game.timestep import FixedTimestep
+from game.world import GameWorld
+
+
+def live_inputs(frames, seed=0):
+    """Input as main() sees it live: frame dt, faces, wrists, voice level and events."""
+    rng = random.Random(seed)
+    for t in range(frames):
+        batch = FaceMetricsBatch.empty(2)
+        batch.yaw[:] = [rng.uniform(-0.6, 0.6) for _ in range(2)]
+        batch.pitch[:] = [rng.uniform(-0.4, 0.4) for _ in range(2)]
+        batch.mouth_open_ratio[:] = [rng.uniform(0.0, 0.1) for _ in range(2)]
+        batch.blink[:] = [rng.random() < 0.1 for _ in range(2)]
+        batch.face_coords[:] = [(rng.uniform(100, 540), rng.uniform(100, 380)) for _ in range(2)]
+        hands = [(rng.randrange(640), rng.randrange(480))] if t % 3 else []
+        events = EVENT_PORTAL if t % 200 == 50 else 0
+        yield rng.choice((16, 17, 33)) / 1000.0, batch, hands, rng.uniform(0.0, 900.0), events
+
+
+def snapshot(world):
+    return (world.time, list(world.player_lives), world.wave_kills,
+            [(p.x, p.y) for p in world.portals],
+            world.creatures.x.copy(), world.creatures.y.copy(),
+            world.lasers.x.copy(), world.lasers.y.copy())
+
+
+def simulate(steps, seed=1):
+    """World state after every frame of main()'s loop, fed (elapsed, metrics, hands, amp, events)."""
+    world = GameWorld((640, 480), seed=seed)
+    timestep = FixedTimestep(1/60)
+    pending_blinks = np.zeros(0, dtype=bool)
+    last_ts = 0.0
+    for elapsed, metrics_list, hands, amp, events in steps:
+        sim_dt, last_ts = elapsed - last_ts, elapsed
+        if events & EVENT_PORTAL:
+            world.open_portal()
+        blinks = metrics_list.blink.copy()
+        held = min(len(blinks), len(pending_blinks))
+        blinks[:held] |= pending_blinks[:held]
+        pending_blinks = blinks
+        for _ in range(timestep.advance(sim_dt)):
+            world.step(timestep.dt, metrics_list.with_blinks(pending_blinks), hands, amp)
+            pending_blinks = np.zeros(len(metrics_list), dtype=bool)
+        yield snapshot(world)
+
+
+def assert_same(live, replayed):
+    assert len(live) == len(replayed)
+    for frame, (a, b) in enumerate(zip(live, replayed)):
+        for x, y in zip(a, b):
+            assert np.array_equal(x, y), f"diverged at frame {frame}"
+
+
+@pytest.mark.parametrize('speed', [0, 1e9])
+def test_replay_reproduces_live_world_state(tmp_path, speed):
+    path = tmp_path / 'session.fcr'
+
+    def live():
+        elapsed = 0.0
+        with PerceptionRecorder(path, seed=1) as recorder:
+            for dt, metrics_list, hands, amp, events in live_inputs(600):
+                elapsed += dt
+                recorder.write(elapsed, metrics_list, hands, amp, events)
+                yield elapsed, metrics_list, hands, amp, events
+
+    def replayed():
+        replay = PerceptionReplay(path, speed=speed)
+        while True:
+            result = replay.read()
+            if replay.finished:
+                break
+            yield result.timestamp, result.metrics, result.hands, replay.amp, replay.events
+
+    live_states = list(simulate(live()))
+    assert live_states[-1][0] > 5.0
+    assert any(state[3] for state in live_states)
+    replay_seed = PerceptionReplay(path).seed
+    assert replay_seed == 1
+    assert_same(live_states, list(simulate(replayed(), seed=replay_seed)))
+
+
+def test_replay_returns_every_record_once(tmp_path):
+    path = tmp_path / 'session.fcr'
+    with PerceptionRecorder(path) as recorder:
+        for t in range(10):
+            batch = FaceMetricsBatch.empty(1)
+            batch.blink[:] = t % 2 == 0
+            recorder.write(t / 60, batch)
+    # Far behind schedule: records are played one per read, none merged
+    replay = PerceptionReplay(path, speed=1e9)
+    results = [replay.read() for _ in range(10)]
+    assert [r.timestamp for r in results] == [t / 60 for t in range(10)]
+    assert [bool(r.metrics.blink[0]) for r in results] == [t % 2 == 0 for t in range(10)]
+    replay.read()
+    assert replay.finished
+
+
+def test_seed_and_events_round_trip(tmp_path):
+    path = tmp_path / 'session.fcr'
+    with PerceptionRecorder(path, seed=2**40 + 3) as recorder:
+        for t in range(3):
+            recorder.write(t / 60, FaceMetricsBatch.empty(0), events=EVENT_PORTAL if t == 1 else 0)
+    replay = PerceptionReplay(path, speed=0)
+    assert replay.seed == 2**40 + 3
+    events = []
+    for _ in range(3):
+        replay.read()
+        events.append(replay.events)
+    assert events == [0, EVENT_PORTAL, 0]
+
+    with PerceptionRecorder(path):
+        pass
+    assert PerceptionReplay(path).seed is None
@@ -0,0 +1,68 @@
+import pygame
+import pytest
+
+from game.entities import EntityStore
+from game.render import DirtyRects, RenderCache, merge_rects
+
+
+@pytest.fixture
+def display(monkeypatch):
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((640, 480))
+    calls = []
+    monkeypatch.setattr(pygame.display, 'flip', lambda: calls.append('flip'))
+    monkeypatch.setattr(pygame.display, 'update', lambda rects: calls.append(list(rects)))
+    yield screen, calls
+    pygame.display.quit()
+
+
+def draw_avatar(screen, dirty, cx, cy, radius=100):
+    # The parts main() draws for one face, with the rects it marks dirty
+    draw = pygame.draw
+    dirty.add(draw.circle(screen, (200, 200, 200), (cx, cy), radius, 2))
+    for side in (-1, 1):
+        ex = cx + side * 40
+        dirty.add(draw.circle(screen, (255, 255, 255), (ex, cy - 20), 15))
+        dirty.add(draw.line(screen, (255, 255, 255), (ex - 15, cy - 35), (ex + 15, cy - 35), 3))
+    dirty.add(draw.ellipse(screen, (150, 0, 0), pygame.Rect(cx - 50, cy + 58, 100, 4)))
+    for j in range(3):
+        dirty.add(draw.circle(screen, (255, 0, 0), (cx - 16 + j * 16, cy - radius - 20), 6))
+    dirty.add(draw.line(screen, (200, 200, 200), (cx - 60, cy + 30), (cx - 150, cy + 60), 4))
+    dirty.add(draw.line(screen, (200, 200, 200), (cx + 60, cy + 30), (cx + 150, cy + 60), 4))
+
+
+def test_merge_rects_removes_overlaps():
+    merged = merge_rects([(0, 0, 10, 10), (5, 5, 10, 10), (100, 100, 5, 5), (12, 12, 10, 10)])
+    assert sorted(map(tuple, merged)) == [(0, 0, 22, 22), (100, 100, 5, 5)]
+
+
+def test_normal_scene_updates_only_dirty_rects(display):
+    screen, calls = display
+    dirty = DirtyRects(screen.get_size())
+    cache = RenderCache(pygame.font.SysFont(None, 24), dirty=dirty)
+    creatures = EntityStore()
+    for k in range(20):
+        creatures.add('ghost', 30 + k * 29, 40 + (k % 4) * 100, radius=15, color=(200, 200, 255))
+    for frame in range(3):
+        screen.fill((30, 30, 30))
+        # Two players moving a little each frame
+        draw_avatar(screen, dirty, 160 + frame * 3, 260)
+        draw_avatar(screen, dirty, 480 - frame * 3, 260)
+        cache.queue_store(creatures)
+        cache.flush(screen)
+        assert dirty.present() == (frame == 0)
+    assert calls[0] == 'flip'
+    assert all(isinstance(call, list) and call for call in calls[1:])
+    # The partial updates cover well under the full screen
+    area = sum(r.w * r.h for r in calls[-1])
+    assert area < 0.5 * 640 * 480
+
+
+def test_large_dirty_area_falls_back_to_flip(display):
+    screen, calls = display
+    dirty = DirtyRects(screen.get_size())
+    dirty.present()
+    dirty.add((0, 0, 600, 400))
+    assert dirty.present()
+    assert calls == ['flip', 'flip']
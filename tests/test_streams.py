@@ -0,0 +1,65 @@
+import threading
+
+from face_controls.metrics import FaceMetricsBatch, PerceptionResult
+from face_controls.streams import BLOCK, DROP_OLDEST, LATEST, Stamped, Stream, carry_blinks
+
+# (item, face) pairs that blink in the source
+BLINKS = {(3, 0), (11, 1)}
+
+
+def blink_source(count=20, wrap=False):
+    """Stream read() yielding two-face batches with BLINKS, once subscribers are ready."""
+    ready = threading.Event()
+    items = iter(range(count))
+
+    def read():
+        ready.wait()
+        k = next(items)
+        batch = FaceMetricsBatch.empty(2)
+        for face in range(2):
+            batch.blink[face] = (k, face) in BLINKS
+        value = PerceptionResult(batch, [], None, float(k)) if wrap else batch
+        return Stamped(float(k), 'face', value)
+    return read, ready
+
+
+def blinks(item):
+    return getattr(item.value, 'metrics', item.value).blink.tolist()
+
+
+def drain(sub):
+    return list(sub)
+
+
+def test_coalescing_does_not_change_other_subscribers_items():
+    for wrap in (False, True):
+        read, ready = blink_source(wrap=wrap)
+        stream = Stream(read, 'face', coalesce=carry_blinks)
+        everything = stream.subscribe(BLOCK, maxsize=100)
+        latest = stream.subscribe(LATEST)
+        recent = stream.subscribe(DROP_OLDEST, maxsize=2)
+        ready.set()
+        items = drain(everything)
+        assert [item.timestamp for item in items] == [float(k) for k in range(20)]
+        # Each blink arrives once, on its own item, for the lossless subscriber
+        delivered = {(int(item.timestamp), face)
+                     for item in items for face, b in enumerate(blinks(item)) if b}
+        assert delivered == BLINKS
+        assert sum(sum(blinks(item)) for item in items) == len(BLINKS)
+        # The lossy subscribers got both blinks folded into what they kept
+        for sub in (latest, recent):
+            kept = drain(sub)
+            assert [any(item_blinks) for item_blinks in zip(*map(blinks, kept))] == [True, True]
+            assert sum(sum(blinks(item)) for item in kept) == len(BLINKS)
+        stream.close()
+
+
+def test_carry_blinks_copies_the_replacement():
+    old = FaceMetricsBatch.empty(1)
+    old.blink[:] = True
+    new = FaceMetricsBatch.empty(1)
+    item = Stamped(1.0, 'face', new)
+    merged = carry_blinks(Stamped(0.0, 'face', old), item)
+    assert merged.value.blink.tolist() == [True]
+    assert new.blink.tolist() == [False]
+    assert carry_blinks(Stamped(0.0, 'face', new), item) is item